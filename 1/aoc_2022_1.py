@@ -1,12 +1,18 @@
 """Solution to AOC Day 1."""
 
 import heapq
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
 
 
 def get_input():
     """Read problem input."""
-    with open("day1_input.txt", encoding="utf-8") as f:
-        return f.readlines()
+    return loader.read_lines(loader.input_path(1))
 
 
 def parse(problem_input):
@@ -23,21 +29,102 @@ def parse(problem_input):
             current_elf_items = []
         else:
             current_elf_items.append(int(line))
+    if current_elf_items:
+        elf_items.append(current_elf_items)
     return elf_items
 
 
-def find_max_calories(elf_items, num_max):
-    """Find the sum of calories carried by the num_max elves with the highest load."""
+def stream_elf_totals(name, chunk_size=1 << 20):
+    """Stream the total calories carried by each elf from the given input file.
+
+    The file is read in binary chunks of chunk_size bytes and each elf is summed on the fly,
+    so memory use does not depend on the size of the input.
+    """
+    current_sum = 0
+    has_items = False
+    remainder = b""
+    for chunk in loader.iter_chunks(name, chunk_size):
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            if line.strip():
+                current_sum += int(line)
+                has_items = True
+            elif has_items:
+                yield current_sum
+                current_sum = 0
+                has_items = False
+    if remainder.strip():
+        current_sum += int(remainder)
+        has_items = True
+    if has_items:
+        yield current_sum
+
+
+def find_max_calorie_sums(elf_totals, num_maxes):
+    """Find the sum of calories carried by the num_max elves with the highest load, for each
+    num_max in num_maxes, using a single pass over the per-elf totals."""
+    largest_num_max = max(num_maxes)
     max_calories = []
-    for current_elf_items in elf_items:
-        current_sum = sum(current_elf_items)
-        if len(max_calories) < num_max:
+    for current_sum in elf_totals:
+        if len(max_calories) < largest_num_max:
             heapq.heappush(max_calories, current_sum)
         else:
             heapq.heappushpop(max_calories, current_sum)
-    return sum(max_calories)
+    max_calories.sort(reverse=True)
+    return tuple(sum(max_calories[:num_max]) for num_max in num_maxes)
+
+
+def find_max_calories(elf_items, num_max):
+    """Find the sum of calories carried by the num_max elves with the highest load."""
+    elf_totals = (sum(current_elf_items) for current_elf_items in elf_items)
+    return find_max_calorie_sums(elf_totals, (num_max,))[0]
+
+
+EXAMPLE_INPUT = """1000
+2000
+3000
+
+4000
+
+5000
+6000
+
+7000
+8000
+9000
+
+10000"""
+
+
+def test():
+    """Test solution."""
+    elf_items = parse(EXAMPLE_INPUT.split("\n"))
+    assert find_max_calories(elf_items, 1) == 24000
+    assert find_max_calories(elf_items, 3) == 45000
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "calories.txt")
+        # Check both with and without a trailing blank line, and with chunks that split lines,
+        # blank lines and elves in every possible place.
+        for problem_input in (EXAMPLE_INPUT, EXAMPLE_INPUT + "\n", EXAMPLE_INPUT + "\n\n"):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(problem_input)
+            for chunk_size in (1, 2, 3, 5, 7, 1 << 20):
+                elf_totals = list(stream_elf_totals(path, chunk_size))
+                assert elf_totals == [6000, 4000, 11000, 24000, 10000], (chunk_size, elf_totals)
+            max_calories = find_max_calorie_sums(stream_elf_totals(path), num_maxes=(1, 3))
+            assert max_calories == (24000, 45000), max_calories
+    print("Tests passed!")
+
+
+def main():
+    """Solve Advent of Code day 1."""
+    max_calories_1, max_calories_3 = find_max_calorie_sums(
+        stream_elf_totals(loader.input_path(1)), num_maxes=(1, 3))
+    print(max_calories_1)
+    print(max_calories_3)
 
 
-parsed_input = parse(get_input())
-print(find_max_calories(parsed_input, num_max=1))
-print(find_max_calories(parsed_input, num_max=3))
+if __name__ == "__main__":
+    test()
+    main()
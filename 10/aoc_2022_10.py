@@ -1,5 +1,14 @@
 """Advent of Code day 10."""
 
+import os
+import sys
+from array import array
+from collections import namedtuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
+
 
 class CPUState:
     """Manage the current CPU state."""
@@ -38,8 +47,7 @@ class CPUState:
 
 def get_input(name):
     """Read problem input."""
-    with open(name, encoding="utf-8") as f:
-        return f.readlines()
+    return loader.read_lines(name)
 
 
 def parse_intructions(problem_input):
@@ -66,6 +74,96 @@ def execute(instructions):
     return cpu
 
 
+Instruction = namedtuple("Instruction", ["name", "cycles", "execute"])
+Instruction.__doc__ = """An instruction taking a number of cycles, after which execute(x, argument)
+returns the new value of the X register."""
+
+
+DEFAULT_INSTRUCTION_SET = (
+    Instruction("noop", 1, lambda x, _: x),
+    Instruction("addx", 2, lambda x, argument: x + argument),
+)
+
+
+def compile_instructions(problem_input, instruction_set=DEFAULT_INSTRUCTION_SET):
+    """Compile instructions from the problem input into opcode and argument arrays.
+    Opcodes index into the instruction set."""
+    opcode_map = {instruction.name: opcode for opcode, instruction in enumerate(instruction_set)}
+    opcodes = array("H")
+    arguments = array("q")
+    for line in problem_input:
+        words = line.split()
+        if not words:
+            continue
+        if words[0] not in opcode_map:
+            raise Exception(f"Unknown instruction: {words[0]}")
+        opcodes.append(opcode_map[words[0]])
+        arguments.append(int(words[1]) if len(words) > 1 else 0)
+    return opcodes, arguments
+
+
+class Emulator:
+    """Table-driven CPU emulator drawing into a bytearray framebuffer.
+
+    Instructions are dispatched through the instruction set by opcode, so new instructions
+    only need a new Instruction entry. The screen wraps around once every pixel is drawn.
+    """
+
+    def __init__(self, instruction_set=DEFAULT_INSTRUCTION_SET, width=40, height=6,
+                 interesting_cycles=(20, 60, 100, 140, 180, 220)):
+        """Initialize an Emulator. interesting_cycles must be sorted in increasing order."""
+        self.instruction_set = instruction_set
+        self.width = width
+        self.height = height
+        self.interesting_cycles = interesting_cycles
+        self.cycle = 1
+        self.x = 1
+        self.signal_strength_sum = 0
+        self.framebuffer = bytearray(b" " * (width * height))
+
+    def run(self, opcodes, arguments):
+        """Execute compiled instructions, returning the emulator."""
+        cycle_costs = [instruction.cycles for instruction in self.instruction_set]
+        handlers = [instruction.execute for instruction in self.instruction_set]
+        width = self.width
+        screen_size = width * self.height
+        framebuffer = self.framebuffer
+        interesting_cycles = self.interesting_cycles
+        next_interesting_index = 0
+        while (next_interesting_index < len(interesting_cycles)
+               and interesting_cycles[next_interesting_index] < self.cycle):
+            next_interesting_index += 1
+        next_interesting = (interesting_cycles[next_interesting_index]
+                            if next_interesting_index < len(interesting_cycles) else None)
+        cycle = self.cycle
+        x = self.x
+        signal_strength_sum = self.signal_strength_sum
+        for opcode, argument in zip(opcodes, arguments):
+            for _ in range(cycle_costs[opcode]):
+                if cycle == next_interesting:
+                    signal_strength_sum += cycle * x
+                    next_interesting_index += 1
+                    next_interesting = (interesting_cycles[next_interesting_index]
+                                        if next_interesting_index < len(interesting_cycles)
+                                        else None)
+                pixel = (cycle - 1) % screen_size
+                framebuffer[pixel] = 35 if -1 <= pixel % width - x <= 1 else 46  # "#" or "."
+                cycle += 1
+            x = handlers[opcode](x, argument)
+        self.cycle = cycle
+        self.x = x
+        self.signal_strength_sum = signal_strength_sum
+        return self
+
+    def image_string(self):
+        """Get the image string generated during execution."""
+        lines = []
+        for row in range(self.height):
+            lines.append(self.framebuffer[row * self.width:(row + 1) * self.width].decode("ascii"))
+            lines.append("\n")
+        return "".join(lines)
+
+
 EXAMPLE_IMAGE = """##..##..##..##..##..##..##..##..##..##..
 ###...###...###...###...###...###...###.
 ####....####....####....####....####....
@@ -80,15 +178,19 @@ def test():
     cpu = execute(parse_intructions(get_input("test_input.txt")))
     assert cpu.signal_strength_sum == 13140, cpu.signal_strength_sum
     assert cpu.image_string() == EXAMPLE_IMAGE, cpu.image_string()
+    emulator = Emulator().run(*compile_instructions(get_input("test_input.txt")))
+    assert emulator.signal_strength_sum == 13140, emulator.signal_strength_sum
+    assert emulator.image_string() == EXAMPLE_IMAGE, emulator.image_string()
     print("Tests passed!")
 
 
 def main():
     """Advent of Code day 10."""
-    cpu = execute(parse_intructions(get_input("day10_input.txt")))
-    print(cpu.signal_strength_sum)
-    print(cpu.image_string())
+    emulator = Emulator().run(*compile_instructions(get_input(loader.input_path(10))))
+    print(emulator.signal_strength_sum)
+    print(emulator.image_string())
 
 
-test()
-main()
+if __name__ == "__main__":
+    test()
+    main()
@@ -1,20 +1,68 @@
 """Advent of Code day 11."""
 
+import math
+import operator
+import os
+import sys
+from collections import namedtuple
 from dataclasses import dataclass
-from functools import reduce
+from functools import partial
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
 
 
 def get_input(name):
     """Read problem input."""
-    with open(name, encoding="utf-8") as f:
-        return f.readlines()
+    return loader.read_lines(name)
+
+
+ADD = "add"
+MULTIPLY = "multiply"
+SQUARE = "square"
+
+
+class Operation(namedtuple("Operation", ["kind", "operand", "function"])):
+    """A compiled monkey operation. kind is one of ADD, MULTIPLY or SQUARE, operand is the
+    constant operand (unused for SQUARE), and function applies the operation to a worry level."""
+
+    def __call__(self, old):
+        return self.function(old)
+
+
+def _square(old):
+    """Square a worry level."""
+    return old * old
+
+
+def compile_operation(operation_string):
+    """Compile an operation string of the form "new = old <op> <operand|old>" into an Operation."""
+    words = operation_string.split()
+    if len(words) != 5 or words[:3] != ["new", "=", "old"] or words[3] not in ("+", "*"):
+        raise Exception(f"Unsupported monkey operation: {operation_string!r}")
+    operator_symbol, operand_string = words[3], words[4]
+    if operand_string == "old":
+        if operator_symbol == "*":
+            return Operation(SQUARE, 0, _square)
+        # old + old is just old * 2.
+        return Operation(MULTIPLY, 2, partial(operator.mul, 2))
+    operand = int(operand_string)
+    if operator_symbol == "+":
+        return Operation(ADD, operand, partial(operator.add, operand))
+    return Operation(MULTIPLY, operand, partial(operator.mul, operand))
 
 
 @dataclass
 class Monkey:
     """Simple dataclass representing a monkey."""
     items: list[int]
-    operation: callable
+    operation: Operation
     test: int
     on_true: int
     on_false: int
@@ -23,9 +71,9 @@ class Monkey:
 
 def parse_monkey(monkey_lines):
     """Parse a single monkey object."""
-    # pylint: disable=eval-used,unnecessary-lambda-assignment,redefined-outer-name
+    # pylint: disable=redefined-outer-name
     items = [int(num_string.strip()) for num_string in monkey_lines[1].strip(" \n")[15:].split(",")]
-    operation = lambda old: eval(monkey_lines[2].strip(" \n")[16:])
+    operation = compile_operation(monkey_lines[2].strip(" \n")[11:])
     test = int(monkey_lines[3].rstrip().split()[-1])
     on_true = int(monkey_lines[4].rstrip().split()[-1])
     on_false = int(monkey_lines[5].rstrip().split()[-1])
@@ -39,51 +87,164 @@ def parse_monkeys(problem_input):
     return [parse_monkey(chunk) for chunk in chunks]
 
 
-def _gcd(a, b):
-    """Compute the greatest common divisor of a pair of integers.
-    Taken from https://en.wikipedia.org/wiki/Euclidean_algorithm#Implementations."""
-    while b != 0:
-        temp = b
-        b = a % b
-        a = temp
-    return a
-
-
-def gcd(*args):
-    """Compute the greatest common divisor of a list of integers."""
-    assert len(args) >= 2
-    result = _gcd(args[0], args[1])
-    for arg in args[3:]:
-        result = _gcd(result, arg)
-    return result
-
-
-def lcm(*args):
-    """Find the lowest common multiple of a list of integers."""
-    return int(reduce(lambda x, y: x*y, args)/gcd(*args))
-
-
 def evaluate_round(monkeys, divide_worry_levels=True):
     """Evaluate a round of monkeys throwing objects.
     Returns a new list of monkeys with updated state."""
     # Perform all worry level computations modulo the lcm(monkey test divisors) in
     # order to keep worry level sizes relatively small.
-    N = lcm(*(monkey.test for monkey in monkeys))  # pylint: disable=invalid-name
+    N = math.lcm(*(monkey.test for monkey in monkeys))  # pylint: disable=invalid-name
     for monkey in monkeys:
+        operation = monkey.operation.function
+        true_items = monkeys[monkey.on_true].items
+        false_items = monkeys[monkey.on_false].items
+        monkey.num_inspections += len(monkey.items)
         for worry_level in monkey.items:
-            monkey.num_inspections += 1
-            worry_level = monkey.operation(worry_level)
+            worry_level = operation(worry_level)
             if divide_worry_levels:
                 worry_level //= 3
             worry_level = worry_level % N
             if worry_level % monkey.test == 0:
-                monkeys[monkey.on_true].items.append(worry_level)
+                true_items.append(worry_level)
             else:
-                monkeys[monkey.on_false].items.append(worry_level)
+                false_items.append(worry_level)
         monkey.items = []
     return monkeys
 
 
+INT64_MAX = 2**63 - 1
+
+
+def _apply_operation_bound(operation, max_worry_level):
+    """Compute the largest worry level the operation can produce from levels up to the bound."""
+    if operation.kind == SQUARE:
+        return max_worry_level * max_worry_level
+    if operation.kind == ADD:
+        return max_worry_level + operation.operand
+    return max_worry_level * operation.operand
+
+
+def evaluate_rounds_vectorized(monkeys, num_rounds, divide_worry_levels=True,
+                               round_callback=None):
+    """Evaluate num_rounds rounds with each monkey's items held in a NumPy array.
+
+    Each monkey's operation, division and reduction modulo N are applied to its whole item array
+    at once, and the results are split between the two targets with a boolean mask. Items are
+    int64 when every intermediate worry level is guaranteed to fit, and Python ints otherwise.
+    Falls back to evaluate_round when NumPy is not installed. If given, round_callback is called
+    with the monkeys after every round; only their num_inspections are current at that point.
+    """
+    if np is None:
+        for _ in range(num_rounds):
+            monkeys = evaluate_round(monkeys, divide_worry_levels)
+            if round_callback is not None:
+                round_callback(monkeys)
+        return monkeys
+    N = math.lcm(*(monkey.test for monkey in monkeys))  # pylint: disable=invalid-name
+    max_worry_level = max([N - 1] + [item for monkey in monkeys for item in monkey.items])
+    max_intermediate = max(
+        _apply_operation_bound(monkey.operation, max_worry_level) for monkey in monkeys)
+    dtype = np.int64 if max_intermediate <= INT64_MAX else object
+    item_arrays = [np.array(monkey.items, dtype=dtype) for monkey in monkeys]
+    for _ in range(num_rounds):
+        for index, monkey in enumerate(monkeys):
+            items = item_arrays[index]
+            if len(items) == 0:
+                continue
+            monkey.num_inspections += len(items)
+            if monkey.operation.kind == SQUARE:
+                items = items * items
+            elif monkey.operation.kind == ADD:
+                items = items + monkey.operation.operand
+            else:
+                items = items * monkey.operation.operand
+            if divide_worry_levels:
+                items //= 3
+            items %= N
+            divisible = items % monkey.test == 0
+            item_arrays[monkey.on_true] = np.concatenate(
+                (item_arrays[monkey.on_true], items[divisible]))
+            item_arrays[monkey.on_false] = np.concatenate(
+                (item_arrays[monkey.on_false], items[~divisible]))
+            item_arrays[index] = items[:0]
+        if round_callback is not None:
+            round_callback(monkeys)
+    for monkey, items in zip(monkeys, item_arrays):
+        monkey.items = [int(item) for item in items]
+    return monkeys
+
+
+def _item_round(monkeys, monkey_index, worry_level, N):  # pylint: disable=invalid-name
+    """Follow a single item through one round without dividing worry levels.
+    Returns the item's monkey and worry level at the start of the next round, along with the
+    indices of the monkeys that inspected it during this round."""
+    inspected_by = []
+    while True:
+        monkey = monkeys[monkey_index]
+        inspected_by.append(monkey_index)
+        worry_level = monkey.operation.function(worry_level) % N
+        target = monkey.on_true if worry_level % monkey.test == 0 else monkey.on_false
+        # Monkeys take turns in index order, so an item thrown to a later monkey is inspected
+        # again this round while an item thrown to an earlier monkey waits for the next round.
+        if target <= monkey_index:
+            return target, worry_level, inspected_by
+        monkey_index = target
+
+
+def evaluate_rounds_with_cycle_detection(monkeys, num_rounds, inspections_per_round=None):
+    """Evaluate num_rounds rounds without dividing worry levels, fast-forwarding through cycles.
+
+    Items move independently, and an item's (monkey, worry level mod N) state at the start of a
+    round determines the rest of its path, so each item's state sequence must eventually repeat.
+    Each item is followed until its state repeats and its inspection counts are extrapolated over
+    the remaining rounds. Returns the monkeys with the same num_inspections and item placement
+    as calling evaluate_round num_rounds times. If given, inspections_per_round must hold
+    num_rounds lists of one count per monkey, and each round's inspections are added to them by
+    replaying the cycles, at a cost proportional to num_rounds per item.
+    """
+    N = math.lcm(*(monkey.test for monkey in monkeys))  # pylint: disable=invalid-name
+    final_items = [[] for _ in monkeys]
+    for start_index, start_monkey in enumerate(monkeys):
+        for worry_level in start_monkey.items:
+            state = (start_index, worry_level % N)
+            states = []
+            inspections = []
+            first_seen = {}
+            while len(states) < num_rounds and state not in first_seen:
+                first_seen[state] = len(states)
+                states.append(state)
+                next_monkey, next_worry_level, inspected_by = _item_round(monkeys, *state, N)
+                inspections.append(inspected_by)
+                state = (next_monkey, next_worry_level)
+            if len(states) == num_rounds:
+                counted_rounds = [(inspections, 1)]
+                final_state = state
+            else:
+                cycle_start = first_seen[state]
+                full_cycles, remainder = divmod(num_rounds - cycle_start, len(states) - cycle_start)
+                counted_rounds = [
+                    (inspections[:cycle_start], 1),
+                    (inspections[cycle_start:], full_cycles),
+                    (inspections[cycle_start:cycle_start + remainder], 1),
+                ]
+                final_state = states[cycle_start + remainder]
+            if inspections_per_round is not None:
+                cycle_start = first_seen.get(state, len(states))
+                cycle_length = max(1, len(states) - cycle_start)
+                for round_index, round_counts in enumerate(inspections_per_round):
+                    if round_index >= cycle_start:
+                        round_index = cycle_start + (round_index - cycle_start) % cycle_length
+                    for monkey_index in inspections[round_index]:
+                        round_counts[monkey_index] += 1
+            for rounds, multiplier in counted_rounds:
+                for inspected_by in rounds:
+                    for monkey_index in inspected_by:
+                        monkeys[monkey_index].num_inspections += multiplier
+            final_items[final_state[0]].append(final_state[1])
+    for monkey, items in zip(monkeys, final_items):
+        monkey.items = items
+    return monkeys
+
+
 def monkey_business(monkeys):
     """Compute the level of monkey business performed by the given monkeys."""
     most_active_monkeys = list(sorted(monkeys, key=lambda m: m.num_inspections))[-2:]
@@ -100,22 +261,66 @@ def test():
     for _ in range(10000):
         monkeys = evaluate_round(monkeys, divide_worry_levels=False)
     assert monkey_business(monkeys) == 2713310158, monkeys
+    monkeys = parse_monkeys(get_input("test_input.txt"))
+    monkeys = evaluate_rounds_with_cycle_detection(monkeys, 10000)
+    assert monkey_business(monkeys) == 2713310158, monkeys
+    monkeys = evaluate_rounds_vectorized(parse_monkeys(get_input("test_input.txt")), 20)
+    assert monkey_business(monkeys) == 10605, monkeys
+    monkeys = evaluate_rounds_vectorized(
+        parse_monkeys(get_input("test_input.txt")), 10000, divide_worry_levels=False)
+    assert monkey_business(monkeys) == 2713310158, monkeys
+    # With many prime divisors N overflows a float, so it must be computed exactly. Check the
+    # reduced worry levels against a reference that never reduces them.
+    primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79,
+              83, 89, 97, 101, 103, 107, 109, 113]
+    operations = ["new = old * 19", "new = old + 6", "new = old * old", "new = old + old"]
+
+    def make_monkeys():
+        return [Monkey([index + 50, 3 * index + 1], compile_operation(operations[index % 4]),
+                       prime, (index + 1) % len(primes), (index + 7) % len(primes))
+                for index, prime in enumerate(primes)]
+
+    reference = make_monkeys()
+    for _ in range(8):
+        for monkey in reference:
+            monkey.num_inspections += len(monkey.items)
+            for worry_level in monkey.items:
+                worry_level = monkey.operation(worry_level)
+                target = monkey.on_true if worry_level % monkey.test == 0 else monkey.on_false
+                reference[target].items.append(worry_level)
+            monkey.items = []
+    expected = [monkey.num_inspections for monkey in reference]
+    for evaluate in (
+            lambda monkeys: [evaluate_round(monkeys, divide_worry_levels=False)
+                             for _ in range(8)][-1],
+            lambda monkeys: evaluate_rounds_vectorized(monkeys, 8, divide_worry_levels=False),
+            lambda monkeys: evaluate_rounds_with_cycle_detection(monkeys, 8)):
+        inspections = [monkey.num_inspections for monkey in evaluate(make_monkeys())]
+        assert inspections == expected, inspections
+    monkeys = parse_monkeys(get_input("test_input.txt"))
+    inspections_per_round = [[0] * len(monkeys) for _ in range(1000)]
+    evaluate_rounds_with_cycle_detection(monkeys, 1000, inspections_per_round)
+    monkeys = parse_monkeys(get_input("test_input.txt"))
+    for round_counts in inspections_per_round:
+        before = [monkey.num_inspections for monkey in monkeys]
+        monkeys = evaluate_round(monkeys, divide_worry_levels=False)
+        after = [monkey.num_inspections for monkey in monkeys]
+        assert round_counts == [now - then for now, then in zip(after, before)], round_counts
     print("Tests passed!")
 
 
 def main():
     """Solve Advent of Code day 11."""
     # Part 1.
-    monkeys = parse_monkeys(get_input("day11_input.txt"))
-    for _ in range(20):
-        monkeys = evaluate_round(monkeys)
+    monkeys = parse_monkeys(get_input(loader.input_path(11)))
+    monkeys = evaluate_rounds_vectorized(monkeys, 20)
     print(monkey_business(monkeys))
     # Part 2. Just re-parse the input instead of making a copy of the initial state.
-    monkeys = parse_monkeys(get_input("day11_input.txt"))
-    for _ in range(10000):
-        monkeys = evaluate_round(monkeys, divide_worry_levels=False)
+    monkeys = parse_monkeys(get_input(loader.input_path(11)))
+    monkeys = evaluate_rounds_with_cycle_detection(monkeys, 10000)
     print(monkey_business(monkeys))
 
 
-test()
-main()
+if __name__ == "__main__":
+    test()
+    main()
@@ -1,7 +1,16 @@
 """Advent of Code day 12."""
 
-import string
+import hashlib
 import heapq
+import os
+import string
+import sys
+from array import array
+from collections import OrderedDict, deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
 
 
 class PriorityQueue:
@@ -36,8 +45,7 @@ class PriorityQueue:
 
 def get_input(name):
     """Read problem input."""
-    with open(name, encoding="utf-8") as f:
-        return f.readlines()
+    return loader.read_lines(name)
 
 
 HEIGHT_MAP = {character: index for index, character in enumerate(string.ascii_lowercase)}
@@ -64,7 +72,7 @@ def parse(problem_input):
 
 def bounds_check(node, n_rows, n_cols):
     """Check if the given node is within bounds."""
-    return node[0] >= 0 and node[1] >= 0 and node[0] < n_rows and node[1] <= n_cols
+    return node[0] >= 0 and node[1] >= 0 and node[0] < n_rows and node[1] < n_cols
 
 
 def neighbours(node, height_map, n_rows, n_cols):
@@ -74,20 +82,18 @@ def neighbours(node, height_map, n_rows, n_cols):
         if bounds_check(neighbour, n_rows, n_cols):
             current_height = height_map[node[0]][node[1]]
             neighbour_height = height_map[neighbour[0]][neighbour[1]]
-            print(f"height: {neighbour_height}")
-            if abs(neighbour_height - current_height) <= 1:
+            if neighbour_height - current_height <= 1:
                 yield neighbour
 
 
 def shortest_path(height_map, start_node, end_node):
     """Find the shortest length path from start_node to end_node."""
     n_rows = len(height_map)
-    n_cols = len(height_map)
+    n_cols = len(height_map[0])
     distances= {start_node: 0}
     queue = PriorityQueue()
     queue.add_item(start_node, 0)
     while end_node not in distances:
-        print(queue.pq)
         _, next_node = queue.pop()
         neighbour_distance = distances[next_node] + 1
         for neighbour in neighbours(next_node, height_map, n_rows, n_cols):
@@ -97,11 +103,211 @@ def shortest_path(height_map, start_node, end_node):
     return distances[end_node]
 
 
+# Height of the padding around the grid. No step can ever reach it.
+BORDER_HEIGHT = 255
+UNREACHED = -1
+
+
+class HillMap:
+    """Height map stored as a flat bytearray padded with an unreachable border.
+
+    Cells are addressed by flat index into the padded grid, so the four neighbours of a cell
+    are at fixed offsets and no bounds checks are needed. A second grid holds the inverted
+    heights, turning a reverse search (walking downhill from the end) into a forward search.
+    """
+
+    def __init__(self, heights, start, end):
+        """Initialize a HillMap from the list-of-lists heights returned by parse."""
+        self.n_rows = len(heights)
+        self.n_cols = len(heights[0])
+        self.width = self.n_cols + 2
+        self.heights = bytearray([BORDER_HEIGHT]) * (self.width * (self.n_rows + 2))
+        self.inverted_heights = bytearray(self.heights)
+        for i, row in enumerate(heights):
+            row_start = self.index((i, 0))
+            self.heights[row_start:row_start + self.n_cols] = bytes(row)
+            self.inverted_heights[row_start:row_start + self.n_cols] = bytes(
+                HEIGHT_MAP["z"] - height for height in row)
+        self.offsets = (1, -1, self.width, -self.width)
+        self.start = self.index(start)
+        self.end = self.index(end)
+
+    def index(self, node):
+        """Get the flat index of a (row, column) node."""
+        return (node[0] + 1) * self.width + node[1] + 1
+
+    def node(self, index):
+        """Get the (row, column) node at a flat index."""
+        return index // self.width - 1, index % self.width - 1
+
+    def cells_with_height(self, height):
+        """Return the flat indices of all cells with the given height."""
+        return [index for index, cell_height in enumerate(self.heights) if cell_height == height]
+
+    def distances(self, sources, reverse=False, target=None):
+        """Breadth-first search from every source at once.
+
+        Returns an array of step counts indexed by flat index, UNREACHED for cells that cannot be
+        reached. In reverse mode the steps are walked backwards, so the distances are to the
+        sources rather than from them. The search stops early once the target is reached.
+        """
+        heights = self.inverted_heights if reverse else self.heights
+        offsets = self.offsets
+        distances = array("l", [UNREACHED]) * len(heights)
+        frontier = deque(sources)
+        for source in sources:
+            distances[source] = 0
+        while frontier:
+            index = frontier.popleft()
+            if index == target:
+                break
+            max_height = heights[index] + 1
+            neighbour_distance = distances[index] + 1
+            for offset in offsets:
+                neighbour = index + offset
+                if distances[neighbour] == UNREACHED and heights[neighbour] <= max_height:
+                    distances[neighbour] = neighbour_distance
+                    frontier.append(neighbour)
+        return distances
+
+    def shortest_path_length(self):
+        """Find the length of the shortest path from the start to the end."""
+        return self.distances([self.start], target=self.end)[self.end]
+
+    def shortest_path_length_from_lowest(self):
+        """Find the length of the shortest path to the end from any lowest cell, using a single
+        reverse search from the end."""
+        distances = self.distances([self.end], reverse=True)
+        return min(distances[index] for index in self.cells_with_height(HEIGHT_MAP["a"])
+                   if distances[index] != UNREACHED)
+
+
+class DistanceFieldCache:
+    """LRU cache of full distance fields over a single HillMap.
+
+    A field to a target holds the number of steps from every cell to that target (and a field
+    from a source the steps from the source to every cell), so once computed any distance is a
+    single array lookup. Fields are evicted least recently used first once their total size
+    exceeds max_bytes. If cache_dir is given, fields are also saved there, keyed by a hash of the
+    grid, and loaded back instead of being recomputed.
+    """
+
+    def __init__(self, hill_map, max_bytes=64 * 1024 * 1024, cache_dir=None):
+        """Initialize a DistanceFieldCache."""
+        self.hill_map = hill_map
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.fields = OrderedDict()
+        self.num_bytes = 0
+        self.grid_hash = hashlib.sha256(
+            bytes(hill_map.heights) + hill_map.width.to_bytes(8, "little")).hexdigest()
+
+    def _field_path(self, key):
+        """Get the file path a field is saved under."""
+        direction, index = key
+        return os.path.join(self.cache_dir, f"{self.grid_hash}_{direction}_{index}.bin")
+
+    def _load(self, key):
+        """Load a field from disk, returning None if it has not been saved."""
+        if self.cache_dir is None:
+            return None
+        path = self._field_path(key)
+        if not os.path.exists(path):
+            return None
+        field = array("l")
+        with open(path, "rb") as f:
+            field.fromfile(f, len(self.hill_map.heights))
+        return field
+
+    def _save(self, key, field):
+        """Save a field to disk."""
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._field_path(key), "wb") as f:
+            field.tofile(f)
+
+    def _field(self, direction, node):
+        """Get the field in the given direction for a node, computing it if needed."""
+        key = (direction, self.hill_map.index(node))
+        if key in self.fields:
+            self.fields.move_to_end(key)
+            return self.fields[key]
+        field = self._load(key)
+        if field is None:
+            field = self.hill_map.distances([key[1]], reverse=direction == "to")
+            self._save(key, field)
+        self.fields[key] = field
+        self.num_bytes += field.itemsize * len(field)
+        while self.num_bytes > self.max_bytes and len(self.fields) > 1:
+            _, evicted = self.fields.popitem(last=False)
+            self.num_bytes -= evicted.itemsize * len(evicted)
+        return field
+
+    def field_to(self, target):
+        """Get the distance field from every cell to the target node."""
+        return self._field("to", target)
+
+    def field_from(self, source):
+        """Get the distance field from the source node to every cell."""
+        return self._field("from", source)
+
+    def distance(self, start, end):
+        """Get the number of steps from the start node to the end node, or UNREACHED."""
+        return self.field_to(end)[self.hill_map.index(start)]
+
+    def path(self, start, end):
+        """Recover a shortest path from start to end, as a list of nodes, by following the
+        gradient of the distance field to the end. Returns None if the end is unreachable."""
+        field = self.field_to(end)
+        heights = self.hill_map.heights
+        index = self.hill_map.index(start)
+        if field[index] == UNREACHED:
+            return None
+        path = [index]
+        while field[index] != 0:
+            for offset in self.hill_map.offsets:
+                neighbour = index + offset
+                if (field[neighbour] == field[index] - 1
+                        and heights[neighbour] <= heights[index] + 1):
+                    index = neighbour
+                    break
+            path.append(index)
+        return [self.hill_map.node(index) for index in path]
+
+
+EXAMPLE_INPUT = """Sabqponm
+abcryxxl
+accszExk
+acctuvwj
+abdefghi"""
+
+
+def test():
+    """Test solution."""
+    height_map, start, end = parse(EXAMPLE_INPUT.split("\n"))
+    assert shortest_path(height_map, start, end) == 31
+    hill_map = HillMap(height_map, start, end)
+    part1 = hill_map.shortest_path_length()
+    assert part1 == 31, part1
+    part2 = hill_map.shortest_path_length_from_lowest()
+    assert part2 == 29, part2
+    cache = DistanceFieldCache(hill_map)
+    assert cache.distance(start, end) == 31
+    path = cache.path(start, end)
+    assert len(path) == 32 and path[0] == start and path[-1] == end, path
+    assert cache.distance((4, 0), end) == 29
+    assert len(cache.fields) == 1, cache.fields
+    print("Tests passed!")
+
+
 def main():
     """Advent of Code day 12 solution."""
-    height_map, start, end = parse(get_input("day12_input.txt"))
-    print(start, end)
-    print(shortest_path(height_map, start, end))
+    hill_map = HillMap(*parse(get_input(loader.input_path(12))))
+    print(hill_map.shortest_path_length())
+    print(hill_map.shortest_path_length_from_lowest())
 
 
-main()
+if __name__ == "__main__":
+    test()
+    main()
@@ -1,5 +1,13 @@
 """Solution to AOC day 2."""
 
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
+
+
 ROCK = object()
 PAPER = object()
 SCISSORS = object()
@@ -18,8 +26,7 @@ move_is_beaten_by_move_map = {v: k for k, v in move_beats_move_map.items()}
 
 def get_input():
     """Read problem input."""
-    with open("day2_input.txt", encoding="utf-8") as f:
-        return f.readlines()
+    return loader.read_lines(loader.input_path(2))
 
 
 def parse(problem_input):
@@ -58,7 +65,73 @@ def count_score(rounds, round_score_fn):
     return sum(round_score_fn(left_token, right_token) for left_token, right_token in rounds)
 
 
-parsed_input = parse(get_input())
-print(count_score(parsed_input, round_score_part_1))
-print(count_score(parsed_input, round_score_part_2))
-    
\ No newline at end of file
+ROUND_TOKEN_PAIRS = [
+    (left_token, right_token) for left_token in opponent_move_map for right_token in player_move_map
+]
+
+
+def build_score_table(round_score_fn):
+    """Precompute the score of every possible round under the given scoring scheme."""
+    return {
+        (left_token, right_token): round_score_fn(left_token, right_token)
+        for left_token, right_token in ROUND_TOKEN_PAIRS
+    }
+
+
+SCORE_TABLE_PART_1 = build_score_table(round_score_part_1)
+SCORE_TABLE_PART_2 = build_score_table(round_score_part_2)
+
+
+def get_raw_input():
+    """Read problem input as raw bytes."""
+    return loader.read_bytes(loader.input_path(2))
+
+
+def count_rounds(raw_guide):
+    """Count how often each distinct round occurs in the raw strategy guide bytes."""
+    return {
+        (left_token, right_token): raw_guide.count(f"{left_token} {right_token}".encode("ascii"))
+        for left_token, right_token in ROUND_TOKEN_PAIRS
+    }
+
+
+def count_score_from_counts(round_counts, score_table):
+    """Count the player's score from round occurrence counts and a precomputed score table."""
+    return sum(count * score_table[round_tokens] for round_tokens, count in round_counts.items())
+
+
+EXAMPLE_INPUT = """A Y
+B X
+C Z
+"""
+
+
+def test():
+    """Test solution."""
+    rounds = parse(EXAMPLE_INPUT.strip().split("\n"))
+    assert count_score(rounds, round_score_part_1) == 15
+    assert count_score(rounds, round_score_part_2) == 12
+    round_counts = count_rounds(EXAMPLE_INPUT.encode("ascii"))
+    assert sum(round_counts.values()) == 3, round_counts
+    assert round_counts[("A", "Y")] == 1 and round_counts[("A", "X")] == 0, round_counts
+    score = count_score_from_counts(round_counts, SCORE_TABLE_PART_1)
+    assert score == 15, score
+    score = count_score_from_counts(round_counts, SCORE_TABLE_PART_2)
+    assert score == 12, score
+    # Line endings must not create or hide rounds.
+    round_counts = count_rounds(EXAMPLE_INPUT.replace("\n", "\r\n").encode("ascii") * 2)
+    score = count_score_from_counts(round_counts, SCORE_TABLE_PART_1)
+    assert score == 30, score
+    print("Tests passed!")
+
+
+def main():
+    """Solve Advent of Code day 2."""
+    parsed_round_counts = count_rounds(get_raw_input())
+    print(count_score_from_counts(parsed_round_counts, SCORE_TABLE_PART_1))
+    print(count_score_from_counts(parsed_round_counts, SCORE_TABLE_PART_2))
+
+
+if __name__ == "__main__":
+    test()
+    main()
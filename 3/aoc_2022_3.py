@@ -1,6 +1,12 @@
 """Solution to AOC day 3."""
 
+import os
 import string
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
 
 
 ITEM_PRIORITIES = {
@@ -10,8 +16,7 @@ ITEM_PRIORITIES = {
 
 def get_input():
     """Read problem input."""
-    with open("day3_input.txt", encoding="utf-8") as f:
-        return f.readlines()
+    return loader.read_lines(loader.input_path(3))
 
 
 def duplicate_item_priority(compartment_1, compartment_2):
@@ -50,6 +55,92 @@ def sum_elf_group_badge_priorities(problem_input):
     return priority_sum
 
 
-problem_input_strings = get_input()
-print(sum_rucksack_priorities(problem_input_strings, duplicate_item_priority))
-print(sum_elf_group_badge_priorities(problem_input_strings))
+def _item_bit(byte):
+    """Get the single-bit mask of an item byte, with the bit index given by the item priority
+    minus one. Non-item bytes (e.g. line endings) map to 0 so they never contribute to a mask."""
+    priority = ITEM_PRIORITIES.get(chr(byte))
+    return 0 if priority is None else 1 << (priority - 1)
+
+
+ITEM_BITS = [_item_bit(byte) for byte in range(256)]
+
+
+def item_mask(items):
+    """Encode a bytes string of items as a 52-bit integer mask of the item types present."""
+    mask = 0
+    for byte in items:
+        mask |= ITEM_BITS[byte]
+    return mask
+
+
+def mask_priority(mask):
+    """Get the priority of the single item type present in a mask."""
+    assert mask and mask & (mask - 1) == 0, bin(mask)
+    return mask.bit_length()
+
+
+def sum_rucksack_mask_priorities(lines):
+    """Sum the priority of the item duplicated across both compartments of each rucksack.
+    Each line is a bytes string."""
+    priority_sum = 0
+    for line in lines:
+        line = line.rstrip(b"\r\n")
+        halfway = len(line) // 2
+        priority_sum += mask_priority(item_mask(line[:halfway]) & item_mask(line[halfway:]))
+    return priority_sum
+
+
+def sum_elf_group_badge_mask_priorities(lines, group_size=3):
+    """Sum the priorities of the badge item shared by each group of group_size elves.
+    Each line is a bytes string."""
+    priority_sum = 0
+    badge_mask = 0
+    num_lines = 0
+    for line in lines:
+        mask = item_mask(line)
+        badge_mask = mask if num_lines % group_size == 0 else badge_mask & mask
+        num_lines += 1
+        if num_lines % group_size == 0:
+            priority_sum += mask_priority(badge_mask)
+    assert num_lines % group_size == 0, num_lines
+    return priority_sum
+
+
+EXAMPLE_INPUT = """vJrwpWtwJgWrhcsFMMfFFhFp
+jqHRNqRjqzjGDLGLrsFMfFZSrLrFZsSL
+PmmdzqPrVvPwwTWBwg
+wMqvLMZHhHMvwLHjbvcjnnSBnvTQFn
+ttgJtRGJQctTZtZT
+CrZsJsPPZsGzwwsLwLmpwMDw
+"""
+
+
+def test():
+    """Test solution."""
+    lines = EXAMPLE_INPUT.strip().split("\n")
+    priority_sum = sum_rucksack_priorities(lines, duplicate_item_priority)
+    assert priority_sum == 157, priority_sum
+    priority_sum = sum_elf_group_badge_priorities(lines)
+    assert priority_sum == 70, priority_sum
+    for item, priority in ITEM_PRIORITIES.items():
+        assert mask_priority(item_mask(item.encode("ascii"))) == priority, item
+    assert item_mask(b"aA\r\n") == item_mask(b"Aa") == 1 | 1 << 26
+    for problem_input in (EXAMPLE_INPUT, EXAMPLE_INPUT.replace("\n", "\r\n")):
+        buffer = problem_input.encode("ascii")
+        priority_sum = sum_rucksack_mask_priorities(loader.iter_lines(buffer))
+        assert priority_sum == 157, priority_sum
+        priority_sum = sum_elf_group_badge_mask_priorities(loader.iter_lines(buffer))
+        assert priority_sum == 70, priority_sum
+    print("Tests passed!")
+
+
+def main():
+    """Solve Advent of Code day 3."""
+    with loader.map_input(loader.input_path(3)) as problem_input_buffer:
+        print(sum_rucksack_mask_priorities(loader.iter_lines(problem_input_buffer)))
+        print(sum_elf_group_badge_mask_priorities(loader.iter_lines(problem_input_buffer)))
+
+
+if __name__ == "__main__":
+    test()
+    main()
@@ -1,39 +1,200 @@
 
 """Advent of Code day 4."""
 
+import bisect
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
+
+
 def get_input():
     """Read problem input."""
-    with open("day4_input.txt", encoding="utf-8") as f:
-        return f.readlines()
+    return loader.read_lines(loader.input_path(4))
 
 
-def assignment_set_from_string(section_range_string):
-    """Construct the set of assigned section IDs from a section range string."""
+def assignment_interval_from_string(section_range_string):
+    """Construct the inclusive (start, end) interval of assigned section IDs from a section range
+    string."""
     start, end_inclusive = map(int, section_range_string.split("-"))
-    return set(range(start, end_inclusive+1))
+    return start, end_inclusive
+
+
+def intervals_overlap(left_interval, right_interval):
+    """Check if two inclusive intervals share at least one section."""
+    return left_interval[0] <= right_interval[1] and right_interval[0] <= left_interval[1]
+
+
+def interval_contains(outer_interval, inner_interval):
+    """Check if the outer interval fully contains the inner interval."""
+    return outer_interval[0] <= inner_interval[0] and inner_interval[1] <= outer_interval[1]
 
 
 def parse(problem_input):
-    """Parse the problem input into a list of section assignment set pairs."""
+    """Parse the problem input into a list of section assignment interval pairs."""
     for line in problem_input:
         left_section_string, right_section_string = line.rstrip("\n").split(",")
-        left_set = assignment_set_from_string(left_section_string)
-        right_set = assignment_set_from_string(right_section_string)
-        yield left_set, right_set
+        left_interval = assignment_interval_from_string(left_section_string)
+        right_interval = assignment_interval_from_string(right_section_string)
+        yield left_interval, right_interval
 
 
 def solve(problem_input):
     """Solve Advent of Code day 4."""
     fully_overlapping_pairs_count = 0
     overlapping_pairs_count = 0
-    for left_set, right_set in parse(problem_input):
-        if left_set & right_set:
+    for left_interval, right_interval in parse(problem_input):
+        if intervals_overlap(left_interval, right_interval):
             overlapping_pairs_count += 1
-            if left_set.issubset(right_set) or right_set.issubset(left_set):
+            if (interval_contains(left_interval, right_interval)
+                    or interval_contains(right_interval, left_interval)):
                 fully_overlapping_pairs_count += 1
     return fully_overlapping_pairs_count, overlapping_pairs_count
 
 
-part_1_solution, part_2_solution = solve(get_input())
-print(part_1_solution)
-print(part_2_solution)
+class AssignmentIndex:
+    """Static index over section assignment pairs answering section and window queries.
+
+    Each pair is stored as the union of its two intervals: one merged interval when the ranges
+    touch, or two disjoint intervals plus the gap between them otherwise. Intervals are sorted by
+    start with a max-end segment tree on top for stabbing queries, and disjoint pairs are kept in
+    a merge sort tree so that pairs hitting a window with both ranges are only counted once.
+    """
+
+    def __init__(self, assignment_pairs):
+        """Build the index from an iterable of (left_interval, right_interval) pairs."""
+        intervals = []
+        gaps = []
+        for pair_index, pair in enumerate(assignment_pairs):
+            first, second = sorted(pair)
+            if first[1] + 1 >= second[0]:
+                intervals.append((first[0], max(first[1], second[1]), pair_index))
+            else:
+                intervals.append((first[0], first[1], pair_index))
+                intervals.append((second[0], second[1], pair_index))
+                gaps.append((first[1], second[0]))
+        intervals.sort()
+        self.intervals = intervals
+        self.starts = [start for start, _, _ in intervals]
+        self.sorted_ends = sorted(end for _, end, _ in intervals)
+        self.size = 1
+        while self.size < len(intervals):
+            self.size *= 2
+        self.max_ends = [float("-inf")] * (2 * self.size)
+        for index, (_, end, _) in enumerate(intervals):
+            self.max_ends[self.size + index] = end
+        for node in range(self.size - 1, 0, -1):
+            self.max_ends[node] = max(self.max_ends[2 * node], self.max_ends[2 * node + 1])
+        gaps.sort()
+        self.gap_left_ends = [left_end for left_end, _ in gaps]
+        self.gap_size = 1
+        while self.gap_size < len(gaps):
+            self.gap_size *= 2
+        self.gap_right_starts = [[] for _ in range(2 * self.gap_size)]
+        for index, (_, right_start) in enumerate(gaps):
+            self.gap_right_starts[self.gap_size + index] = [right_start]
+        for node in range(self.gap_size - 1, 0, -1):
+            self.gap_right_starts[node] = sorted(
+                self.gap_right_starts[2 * node] + self.gap_right_starts[2 * node + 1])
+
+    def _stab(self, node, node_start, node_end, limit, section, found):
+        """Collect the pair indices of intervals in [node_start, node_end) below limit that
+        contain the section."""
+        if node_start >= limit or self.max_ends[node] < section:
+            return
+        if node >= self.size:
+            found.add(self.intervals[node - self.size][2])
+            return
+        middle = (node_start + node_end) // 2
+        self._stab(2 * node, node_start, middle, limit, section, found)
+        self._stab(2 * node + 1, middle, node_end, limit, section, found)
+
+    def pairs_touching_section(self, section):
+        """Return the sorted indices of all pairs where either elf is assigned the section."""
+        found = set()
+        limit = bisect.bisect_right(self.starts, section)
+        self._stab(1, 0, self.size, limit, section, found)
+        return sorted(found)
+
+    def _count_double_hits(self, window_start, window_end):
+        """Count disjoint pairs where both ranges overlap the window."""
+        lo = self.gap_size + bisect.bisect_left(self.gap_left_ends, window_start)
+        hi = self.gap_size + len(self.gap_left_ends)
+        count = 0
+        while lo < hi:
+            if lo & 1:
+                count += bisect.bisect_right(self.gap_right_starts[lo], window_end)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                count += bisect.bisect_right(self.gap_right_starts[hi], window_end)
+            lo //= 2
+            hi //= 2
+        return count
+
+    def count_pairs_overlapping_window(self, window_start, window_end):
+        """Count the pairs where either elf is assigned a section in [window_start, window_end]."""
+        starting_before_end = bisect.bisect_right(self.starts, window_end)
+        ending_before_start = bisect.bisect_left(self.sorted_ends, window_start)
+        return (starting_before_end - ending_before_start
+                - self._count_double_hits(window_start, window_end))
+
+
+EXAMPLE_INPUT = """2-4,6-8
+2-3,4-5
+5-7,7-9
+2-8,3-7
+6-6,4-6
+2-6,4-8"""
+
+
+def test():
+    """Test solution."""
+    lines = EXAMPLE_INPUT.split("\n")
+    solution = solve(lines)
+    assert solution == (2, 4), solution
+    pairs = list(parse(lines))
+    index = AssignmentIndex(pairs)
+    assert index.pairs_touching_section(1) == [], index.pairs_touching_section(1)
+    assert index.pairs_touching_section(6) == [0, 2, 3, 4, 5], index.pairs_touching_section(6)
+    assert index.count_pairs_overlapping_window(4, 5) == 6
+    assert index.count_pairs_overlapping_window(9, 12) == 1
+    # Check the index against a brute-force scan over random assignments.
+    rng = random.Random(0)
+    for _ in range(50):
+        pairs = []
+        for _ in range(rng.randint(1, 40)):
+            pair = []
+            for _ in range(2):
+                start = rng.randint(1, 30)
+                pair.append((start, start + rng.randint(0, 6)))
+            pairs.append(tuple(pair))
+        index = AssignmentIndex(pairs)
+        for section in range(0, 40):
+            expected = [pair_index for pair_index, pair in enumerate(pairs)
+                        if any(start <= section <= end for start, end in pair)]
+            found = index.pairs_touching_section(section)
+            assert found == expected, (pairs, section, found)
+        for _ in range(40):
+            window_start = rng.randint(0, 40)
+            window = (window_start, window_start + rng.randint(0, 8))
+            expected = sum(1 for pair in pairs
+                           if any(intervals_overlap(interval, window) for interval in pair))
+            count = index.count_pairs_overlapping_window(*window)
+            assert count == expected, (pairs, window, count)
+    print("Tests passed!")
+
+
+def main():
+    """Solve Advent of Code day 4."""
+    part_1_solution, part_2_solution = solve(get_input())
+    print(part_1_solution)
+    print(part_2_solution)
+
+
+if __name__ == "__main__":
+    test()
+    main()
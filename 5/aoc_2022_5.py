@@ -1,12 +1,16 @@
 """Advent of Code day 5."""
 
-import copy
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
 
 
 def get_input():
     """Read problem input."""
-    with open("day5_input.txt", encoding="utf-8") as f:
-        return f.read()
+    return loader.read_text(loader.input_path(5))
 
 
 def parse_stacks(stacks_string):
@@ -37,30 +41,149 @@ def parse_moves(moves_string):
 
 def parse(problem_input):
     """Parse the problem input into an initial stacks state and a list of moves."""
-    stacks_string, moves_string = problem_input.split("\n\n")
+    stacks_string, moves_string = problem_input.rstrip("\n").split("\n\n")
     stacks = parse_stacks(stacks_string)
     moves = parse_moves(moves_string)
     return stacks, moves
 
 
-def execute_moves_9000(initial_stacks, moves):
-    """Execute the given moves on the initial stacks state, moving one crate at a time."""
-    stacks = copy.deepcopy(initial_stacks)
+def freeze_stacks(stacks):
+    """Freeze a parsed stack state into tuples so it can be shared between crane runs."""
+    return (None,) + tuple(tuple(stack) for stack in stacks[1:])
+
+
+def _segment_crates(segment):
+    """Get the crates of a segment as a tuple, from bottom to top."""
+    crates, start, end, is_reversed = segment
+    return crates[end - 1:start - 1 if start else None:-1] if is_reversed else crates[start:end]
+
+
+class CraneStacks:
+    """Stacks of crates supporting bulk moves without copying every crate.
+
+    Each stack is a list of segments (crates, start, end, reversed), bottom segment first. A
+    segment is a view onto an immutable tuple of crates: crates[start:end] from bottom to top, or
+    the reverse of that if the reversed flag is set. Moves split at most one segment and relink
+    the rest, and the frozen initial state is shared copy-on-write between any number of runs.
+
+    Any two neighbouring segments hold at least chunk_size crates between them; smaller pairs
+    are copied into a single new segment. A stack of n crates therefore has fewer than
+    2 * n / chunk_size + 1 segments, and moving k crates touches O(1 + k / chunk_size) of them
+    plus at most a few copies of under chunk_size crates. The per-segment bookkeeping only pays
+    off once stacks hold tens of thousands of crates; below that execute_moves_on_lists is faster.
+    """
+
+    def __init__(self, frozen_stacks, chunk_size=1024):
+        """Initialize the stacks from a state produced by freeze_stacks."""
+        self.chunk_size = chunk_size
+        self.stacks = [None] + [
+            [(crates, 0, len(crates), False)] if crates else [] for crates in frozen_stacks[1:]
+        ]
+
+    def _take(self, stack_index, count):
+        """Remove the top count crates from a stack, returning them as segments bottom first."""
+        stack = self.stacks[stack_index]
+        taken = []
+        while count:
+            crates, start, end, is_reversed = stack.pop()
+            length = end - start
+            if length <= count:
+                taken.append((crates, start, end, is_reversed))
+                count -= length
+                continue
+            if is_reversed:
+                stack.append((crates, start + count, end, True))
+                taken.append((crates, start, start + count, True))
+            else:
+                stack.append((crates, start, end - count, False))
+                taken.append((crates, end - count, end, False))
+            count = 0
+        taken.reverse()
+        return taken
+
+    def _coalesce(self, stack, first, last):
+        """Copy neighbouring segments holding fewer than chunk_size crates between them into
+        single segments, for the neighbouring pairs (i - 1, i) with first <= i < last."""
+        i = max(first, 1)
+        last = min(last, len(stack))
+        while i < last:
+            below, above = stack[i - 1], stack[i]
+            if (below[2] - below[1]) + (above[2] - above[1]) < self.chunk_size:
+                crates = _segment_crates(below) + _segment_crates(above)
+                stack[i - 1:i + 1] = [(crates, 0, len(crates), False)]
+                last -= 1
+            else:
+                i += 1
+
+    def move(self, count, move_from, move_to, one_at_a_time):
+        """Move count crates between stacks. Moving one at a time reverses their order, which is
+        recorded by flipping the flag on each moved segment."""
+        source = self.stacks[move_from]
+        taken = self._take(move_from, count)
+        self._coalesce(source, len(source) - 1, len(source))
+        if one_at_a_time:
+            taken = [(crates, start, end, not is_reversed)
+                     for crates, start, end, is_reversed in reversed(taken)]
+        destination = self.stacks[move_to]
+        junction = len(destination)
+        destination.extend(taken)
+        self._coalesce(destination, junction, len(destination))
+
+    def to_lists(self):
+        """Materialize the stacks in the same format returned by parse_stacks."""
+        stacks = [None]
+        for stack in self.stacks[1:]:
+            crates_list = []
+            for segment in stack:
+                crates_list.extend(_segment_crates(segment))
+            stacks.append(crates_list)
+        return stacks
+
+    def top_crates(self):
+        """Get a string representing the top crates on the stacks."""
+        top = []
+        for stack in self.stacks[1:]:
+            crates, start, end, is_reversed = stack[-1]
+            top.append(crates[start] if is_reversed else crates[end - 1])
+        return "".join(top)
+
+
+CRANE_MOVES_ONE_AT_A_TIME = {9000: True, 9001: False}
+
+
+def execute_moves(frozen_stacks, moves, crane_model, chunk_size=1024):
+    """Execute the given moves on a frozen initial stacks state with the given crane model."""
+    one_at_a_time = CRANE_MOVES_ONE_AT_A_TIME[crane_model]
+    crane_stacks = CraneStacks(frozen_stacks, chunk_size)
+    for move_count, move_from, move_to in moves:
+        crane_stacks.move(move_count, move_from, move_to, one_at_a_time)
+    return crane_stacks
+
+
+def execute_moves_on_lists(initial_stacks, moves, crane_model):
+    """Execute the given moves with the given crane model on a copy of the initial stacks state,
+    moving crates with list slices. Each move copies its crates, but in C, which is faster than
+    CraneStacks unless stacks grow to tens of thousands of crates."""
+    one_at_a_time = CRANE_MOVES_ONE_AT_A_TIME[crane_model]
+    stacks = [None] + [list(stack) for stack in initial_stacks[1:]]
     for move_count, move_from, move_to in moves:
-        for _ in range(move_count):
-            crate = stacks[move_from].pop()
-            stacks[move_to].append(crate)
+        source = stacks[move_from]
+        crates = source[-move_count:]
+        del source[-move_count:]
+        if one_at_a_time:
+            crates.reverse()
+        stacks[move_to] += crates
     return stacks
 
 
+def execute_moves_9000(initial_stacks, moves):
+    """Execute the given moves on the initial stacks state, moving one crate at a time."""
+    return execute_moves_on_lists(initial_stacks, moves, crane_model=9000)
+
+
 def execute_moves_9001(initial_stacks, moves):
     """Execute the given moves on the initial stacks state, moving multiple crates at a time."""
-    stacks = copy.deepcopy(initial_stacks)
-    for move_count, move_from, move_to in moves:
-        crates = stacks[move_from][-move_count:]
-        stacks[move_from][-move_count:] = []
-        stacks[move_to].extend(crates)
-    return stacks
+    return execute_moves_on_lists(initial_stacks, moves, crane_model=9001)
 
 
 def top_crates(stacks):
@@ -88,15 +211,25 @@ def test():
     top_crates_string_9001 = top_crates(execute_moves_9001(parsed_stacks, parsed_moves))
     assert top_crates_string_9000 == "CMZ", top_crates_string_9000
     assert top_crates_string_9001 == "MCD", top_crates_string_9001
+    frozen_stacks = freeze_stacks(parsed_stacks)
+    assert execute_moves(frozen_stacks, parsed_moves, 9000).top_crates() == "CMZ"
+    assert execute_moves(frozen_stacks, parsed_moves, 9001).top_crates() == "MCD"
+    for chunk_size in (1, 2, 4):
+        for crane_model in (9000, 9001):
+            crane_stacks = execute_moves(frozen_stacks, parsed_moves, crane_model, chunk_size)
+            expected = execute_moves_on_lists(parsed_stacks, parsed_moves, crane_model)
+            assert crane_stacks.to_lists() == expected, (chunk_size, crane_model)
+    assert parsed_stacks == [None, ['Z', 'N'], ['M', 'C', 'D'], ['P']], parsed_stacks
     print("Tests passed!")
 
 
 def main():
     """Solve AOC2022 day 5."""
     initial_stacks, moves = parse(get_input())
-    print(top_crates(execute_moves_9000(initial_stacks, moves)))
-    print(top_crates(execute_moves_9001(initial_stacks, moves)))
+    print(top_crates(execute_moves_on_lists(initial_stacks, moves, crane_model=9000)))
+    print(top_crates(execute_moves_on_lists(initial_stacks, moves, crane_model=9001)))
 
 
-test()
-main()
+if __name__ == "__main__":
+    test()
+    main()
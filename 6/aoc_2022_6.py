@@ -1,22 +1,47 @@
 """Solution to AOC Day 6."""
 
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
+
+
 def get_input():
     """Read problem input."""
-    with open("day6_input.txt", encoding="utf-8") as f:
-        return f.read()
+    return loader.read_text(loader.input_path(6))
+
+
+def find_start_markers(chunks, window_sizes):
+    """Find the index after the start marker for every given marker length in a single pass.
+
+    The packet is consumed as a stream of byte chunks. Tracking the last position each byte was
+    seen gives the length of the longest run of distinct bytes ending at the current position,
+    and a marker of length n ends at the first position where that run is at least n long.
+    Returns a dict mapping each marker length to its index.
+    """
+    pending = sorted(set(window_sizes))
+    markers = {}
+    last_seen = [-1] * 256
+    run_start = 0
+    position = 0
+    for chunk in chunks:
+        for byte in chunk:
+            if last_seen[byte] >= run_start:
+                run_start = last_seen[byte] + 1
+            last_seen[byte] = position
+            position += 1
+            while pending and position - run_start >= pending[0]:
+                markers[pending.pop(0)] = position
+            if not pending:
+                return markers
+    raise Exception(f"No start marker of length {pending} found in packet.")
 
 
 def find_index_after_start(packet, num_different):
     """Find the index of the start marker, given its length."""
-    window_start_index = 0
-    window_end_index = num_different
-    while window_end_index < len(packet):
-        window = packet[window_start_index:window_end_index]
-        if len(window) == len(set(window)):
-            return window_end_index
-        window_start_index += 1
-        window_end_index += 1
-    raise Exception("No start marker found in packet.")
+    return find_start_markers([packet.encode("ascii")], [num_different])[num_different]
 
 
 def test():
@@ -35,10 +60,20 @@ def test():
     for test_string, expected, num_different in cases:
         index = find_index_after_start(test_string, num_different)
         assert index == expected, f"Expected: {expected}, Actual: {index}"
+    packet = b"mjqjpqmgbljsphdztnvjfqwrcgsmlb"
+    chunks = [packet[index:index + 3] for index in range(0, len(packet), 3)]
+    markers = find_start_markers(chunks, [4, 14])
+    assert markers == {4: 7, 14: 19}, markers
     print("All tests passed!")
 
 
-test()
-problem_input = get_input()
-print(find_index_after_start(problem_input, num_different=4))
-print(find_index_after_start(problem_input, num_different=14))
+def main():
+    """Solve Advent of Code day 6."""
+    start_markers = find_start_markers(loader.iter_chunks(loader.input_path(6)), [4, 14])
+    print(start_markers[4])
+    print(start_markers[14])
+
+
+if __name__ == "__main__":
+    test()
+    main()
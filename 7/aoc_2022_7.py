@@ -1,9 +1,19 @@
 """Solution to AOC Day 7."""
 
+import heapq
+import os
+import random
+import sys
+from array import array
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
+
+
 def get_input():
     """Read problem input."""
-    with open("day7_input.txt", encoding="utf-8") as f:
-        return f.readlines()
+    return loader.read_lines(loader.input_path(7))
 
 
 class TreeNode:
@@ -95,6 +105,405 @@ def find_minimum_size_to_delete(directory_tree, min_size=30_000_000, total_size=
     return min(dir.size for dir in directory_tree.iterate() if dir.size >= min_size - free_space)
 
 
+class FlatTree:
+    """Directory tree stored as parallel arrays indexed by directory id, with the root at id 0.
+
+    Directories are numbered in the order they are first entered, so every directory has a
+    larger id than its parent and sizes can be rolled up in a single reverse pass.
+    """
+
+    def __init__(self):
+        self.parents = array("q", [-1])
+        self.file_sizes = array("q", [0])
+        self.total_sizes = None
+
+    def add_directory(self, parent):
+        """Add a new directory under the given parent and return its id."""
+        self.parents.append(parent)
+        self.file_sizes.append(0)
+        return len(self.parents) - 1
+
+    def compute_sizes(self):
+        """Compute the total size of every directory from the direct file sizes."""
+        total_sizes = array("q", self.file_sizes)
+        for directory in range(len(total_sizes) - 1, 0, -1):
+            total_sizes[self.parents[directory]] += total_sizes[directory]
+        self.total_sizes = total_sizes
+
+    @property
+    def size(self):
+        """The total size of the root directory."""
+        return self.total_sizes[0]
+
+
+def change_directory(parents, current, move_to, child):
+    """Get the id of the directory "$ cd move_to" leads to from the current directory, where
+    child(directory, name) gets the id of a named subdirectory."""
+    if move_to == "/":
+        return 0
+    if move_to == "..":
+        return parents[current]
+    return child(current, move_to)
+
+
+def build_flat_tree(lines):
+    """Build a FlatTree from an iterable of terminal output lines, one line at a time."""
+    tree = FlatTree()
+    current = 0
+    # Every cd into a directory enters a new one, so names are not needed.
+    def child(directory, _):
+        return tree.add_directory(directory)
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.startswith("$ cd "):
+            current = change_directory(tree.parents, current, line[5:], child)
+        elif line[0] != "$" and not line.startswith("dir "):
+            tree.file_sizes[current] += int(line.split(" ", 1)[0])
+    tree.compute_sizes()
+    return tree
+
+
+def sum_flat_directory_sizes(flat_tree, max_size=100000):
+    """Find the sum of directory sizes whose size is less than the given max."""
+    return sum(size for size in flat_tree.total_sizes if size <= max_size)
+
+
+def find_flat_minimum_size_to_delete(flat_tree, min_size=30_000_000, total_size=70_000_000):
+    """Find the size of the smallest directory that needs to be deleted to free up space."""
+    free_space = total_size - flat_tree.size
+    return min(size for size in flat_tree.total_sizes if size >= min_size - free_space)
+
+
+class _TreapNode:
+    """A node of a SizeTreap."""
+    __slots__ = ("key", "priority", "left", "right", "total")
+
+    def __init__(self, key):
+        self.key = key
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.total = key[0]
+
+    def update(self):
+        """Recompute the size sum of the subtree rooted at this node."""
+        self.total = self.key[0]
+        if self.left is not None:
+            self.total += self.left.total
+        if self.right is not None:
+            self.total += self.right.total
+
+
+def _treap_split(node, key):
+    """Split a treap into the nodes with keys less than key, and the rest."""
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _treap_split(node.right, key)
+        node.update()
+        return node, right
+    left, node.left = _treap_split(node.left, key)
+    node.update()
+    return left, node
+
+
+def _treap_merge(left, right):
+    """Merge two treaps where every key in left is less than every key in right."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _treap_merge(left.right, right)
+        left.update()
+        return left
+    right.left = _treap_merge(left, right.left)
+    right.update()
+    return right
+
+
+class SizeTreap:
+    """Sorted set of (size, directory id) keys, augmented with subtree size sums so that
+    threshold sums and successor queries take expected logarithmic time."""
+
+    def __init__(self):
+        self.root = None
+
+    def insert(self, key):
+        """Insert a (size, directory id) key."""
+        left, right = _treap_split(self.root, key)
+        self.root = _treap_merge(_treap_merge(left, _TreapNode(key)), right)
+
+    def remove(self, key):
+        """Remove a (size, directory id) key."""
+        left, right = _treap_split(self.root, key)
+        _, right = _treap_split(right, (key[0], key[1] + 1))
+        self.root = _treap_merge(left, right)
+
+    def sum_at_most(self, max_size):
+        """Sum all sizes less than or equal to max_size."""
+        total = 0
+        node = self.root
+        while node is not None:
+            if node.key[0] <= max_size:
+                total += node.key[0] + (node.left.total if node.left is not None else 0)
+                node = node.right
+            else:
+                node = node.left
+        return total
+
+    def smallest_at_least(self, min_size):
+        """Find the smallest size greater than or equal to min_size, or None if there is none."""
+        best = None
+        node = self.root
+        while node is not None:
+            if node.key[0] >= min_size:
+                best = node.key[0]
+                node = node.left
+            else:
+                node = node.right
+        return best
+
+
+class DirectorySizeIndex:
+    """Directory sizes maintained incrementally from a growing terminal log.
+
+    Terminal output can be fed in any number of batches. Directories and files are tracked by
+    name, so revisiting a directory or listing it again does not count anything twice. Adding a
+    file only updates the sizes of the directories above it, and all directory sizes are kept in a
+    SizeTreap, so queries never rescan the tree.
+    """
+
+    def __init__(self):
+        self.parents = [-1]
+        self.sizes = [0]
+        self.children = [{}]
+        self.file_names = [set()]
+        self.current = 0
+        self.treap = SizeTreap()
+        self.treap.insert((0, 0))
+
+    def _child(self, directory, name):
+        """Get the id of a named child directory, creating it if it is new."""
+        child = self.children[directory].get(name)
+        if child is None:
+            child = len(self.parents)
+            self.parents.append(directory)
+            self.sizes.append(0)
+            self.children.append({})
+            self.file_names.append(set())
+            self.children[directory][name] = child
+            self.treap.insert((0, child))
+        return child
+
+    def _add_file(self, directory, name, file_size, deltas):
+        """Add a file to a directory, adding its size to the directory's pending delta."""
+        if name in self.file_names[directory]:
+            return
+        self.file_names[directory].add(name)
+        deltas[directory] = deltas.get(directory, 0) + file_size
+
+    def _propagate(self, deltas):
+        """Add every pending delta to the deltas of the directory's ancestors.
+
+        Children always have larger ids than their parents, so visiting directories in decreasing
+        id order pushes each delta up one level only after all of its descendants have been added.
+        """
+        pending = [-directory for directory in deltas]
+        heapq.heapify(pending)
+        while pending:
+            directory = -heapq.heappop(pending)
+            parent = self.parents[directory]
+            if parent == -1:
+                continue
+            if parent not in deltas:
+                deltas[parent] = 0
+                heapq.heappush(pending, -parent)
+            deltas[parent] += deltas[directory]
+
+    def feed(self, lines):
+        """Process more lines of terminal output, continuing from where the last batch ended.
+
+        Size changes are collected for the whole batch and pushed up the tree once at the end, so
+        each directory touched by the batch is updated and moved in the SizeTreap only once.
+        """
+        deltas = {}
+        for line in lines:
+            line = line.rstrip("\n")
+            if line.startswith("$ cd "):
+                self.current = change_directory(self.parents, self.current, line[5:], self._child)
+            elif line.startswith("dir "):
+                self._child(self.current, line[4:])
+            elif line and line[0] != "$":
+                size_string, name = line.split(" ", 1)
+                self._add_file(self.current, name, int(size_string), deltas)
+        self._propagate(deltas)
+        for directory, delta in deltas.items():
+            size = self.sizes[directory]
+            self.treap.remove((size, directory))
+            self.treap.insert((size + delta, directory))
+            self.sizes[directory] = size + delta
+
+    @property
+    def size(self):
+        """The total size of the root directory."""
+        return self.sizes[0]
+
+    def sum_directory_sizes(self, max_size=100000):
+        """Find the sum of directory sizes whose size is less than the given max."""
+        return self.treap.sum_at_most(max_size)
+
+    def find_minimum_size_to_delete(self, min_size=30_000_000, total_size=70_000_000):
+        """Find the size of the smallest directory that needs to be deleted to free up space."""
+        free_space = total_size - self.size
+        return self.treap.smallest_at_least(min_size - free_space)
+
+
+class FileSystem(FlatTree):
+    """Path-aware filesystem model built from terminal output.
+
+    Names are interned, and directories and files are stored in parallel arrays keyed by
+    directory id and file id, with the root directory at id 0. The children of a directory are
+    chained through first_child/next_sibling arrays and looked up by (directory id, name id), so
+    holding millions of files costs a few array slots each. Directories are numbered in the order
+    they are first seen, so every directory has a larger id than its parent. A directory's
+    listing is only recorded the first time it is listed.
+
+    Sizes are computed as in FlatTree, so the flat tree solutions accept a FileSystem too.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.names = [""]
+        self.name_ids = {"": 0}
+        self.directory_names = array("q", [0])
+        self.first_child = array("q", [-1])
+        self.next_sibling = array("q", [-1])
+        self.listed = bytearray(1)
+        self.children = {}
+        self.file_directories = array("q")
+        self.file_names = array("q")
+        self.file_sizes_by_id = array("q")
+        self.current = 0
+        self.skipping_listing = False
+
+    def intern(self, name):
+        """Get the id of a name, adding it if it is new."""
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self.name_ids[name] = name_id
+        return name_id
+
+    def child(self, directory, name):
+        """Get the id of a named child directory, creating it if it is new."""
+        key = (directory, self.intern(name))
+        child = self.children.get(key)
+        if child is None:
+            child = len(self.parents)
+            self.parents.append(directory)
+            self.directory_names.append(key[1])
+            self.first_child.append(-1)
+            self.next_sibling.append(self.first_child[directory])
+            self.file_sizes.append(0)
+            self.listed.append(0)
+            self.first_child[directory] = child
+            self.children[key] = child
+        return child
+
+    def add_file(self, directory, name, file_size):
+        """Add a file to a directory and return its id."""
+        self.file_directories.append(directory)
+        self.file_names.append(self.intern(name))
+        self.file_sizes_by_id.append(file_size)
+        self.file_sizes[directory] += file_size
+        return len(self.file_sizes_by_id) - 1
+
+    def feed(self, lines):
+        """Process more lines of terminal output, continuing from where the last batch ended."""
+        self.total_sizes = None
+        for line in lines:
+            line = line.rstrip("\n")
+            if line.startswith("$ cd "):
+                self.skipping_listing = False
+                self.current = change_directory(self.parents, self.current, line[5:], self.child)
+            elif line == "$ ls":
+                self.skipping_listing = self.listed[self.current] == 1
+                self.listed[self.current] = 1
+            elif not line or self.skipping_listing:
+                continue
+            elif line.startswith("dir "):
+                self.child(self.current, line[4:])
+            else:
+                size_string, name = line.split(" ", 1)
+                self.add_file(self.current, name, int(size_string))
+        return self
+
+    def resolve(self, path):
+        """Get the directory id of an absolute path such as "/a/e"."""
+        directory = 0
+        for name in path.split("/"):
+            if not name:
+                continue
+            name_id = self.name_ids.get(name)
+            directory = self.children.get((directory, name_id), -1)
+            if directory == -1:
+                raise Exception(f"No such directory: {path}")
+        return directory
+
+    def path(self, directory):
+        """Get the absolute path of a directory id."""
+        names = []
+        while directory != 0:
+            names.append(self.names[self.directory_names[directory]])
+            directory = self.parents[directory]
+        return "/" + "/".join(reversed(names))
+
+    def du(self, path="/"):
+        """Get the total size of everything under a directory path."""
+        if self.total_sizes is None:
+            self.compute_sizes()
+        return self.total_sizes[self.resolve(path)]
+
+    def iter_du(self, path="/", max_depth=None):
+        """Yield (path, total size) for a directory and every directory under it, down to
+        max_depth levels below it, with each directory after its subdirectories like du."""
+        if self.total_sizes is None:
+            self.compute_sizes()
+        top = self.resolve(path)
+        # Depth first with an explicit stack, so deep trees do not hit the recursion limit. The
+        # names of the directories on the current branch are kept in one list that grows and
+        # shrinks with the walk, so a path costs one join rather than a walk back to the root.
+        top_path = self.path(top)
+        prefix = top_path.rstrip("/") + "/"
+        names = []
+        stack = [(top, 0, False)]
+        while stack:
+            directory, depth, expanded = stack.pop()
+            if expanded:
+                del names[depth:]
+                yield (prefix + "/".join(names) if depth else top_path), self.total_sizes[directory]
+                continue
+            if depth:
+                del names[depth - 1:]
+                names.append(self.names[self.directory_names[directory]])
+            stack.append((directory, depth, True))
+            if max_depth is not None and depth >= max_depth:
+                continue
+            child = self.first_child[directory]
+            while child != -1:
+                stack.append((child, depth + 1, False))
+                child = self.next_sibling[child]
+
+
+def build_file_system(lines):
+    """Build a FileSystem from an iterable of terminal output lines."""
+    file_system = FileSystem().feed(lines)
+    file_system.compute_sizes()
+    return file_system
+
+
 EXAMPLE_INPUT = """$ cd /
 $ ls
 dir a
@@ -128,11 +537,43 @@ def test():
     assert part1 == 95437, part1
     part2 = find_minimum_size_to_delete(example_tree)
     assert part2 == 24933642, part2
+    flat_tree = build_flat_tree(lines)
+    part1 = sum_flat_directory_sizes(flat_tree)
+    assert part1 == 95437, part1
+    part2 = find_flat_minimum_size_to_delete(flat_tree)
+    assert part2 == 24933642, part2
+    index = DirectorySizeIndex()
+    index.feed(lines[:10])
+    assert index.size == 14848514 + 8504156 + 29116, index.size
+    index.feed(lines[10:])
+    index.feed(["$ cd /", "$ ls", "14848514 b.txt", "dir a"])
+    part1 = index.sum_directory_sizes()
+    assert part1 == 95437, part1
+    part2 = index.find_minimum_size_to_delete()
+    assert part2 == 24933642, part2
+    file_system = build_file_system(lines + ["$ cd /", "$ ls", "14848514 b.txt", "$ cd d"])
+    assert file_system.du("/a/e") == 584, file_system.du("/a/e")
+    assert file_system.du("/a") == 94853, file_system.du("/a")
+    assert file_system.du("/d/") == 24933642, file_system.du("/d/")
+    assert dict(file_system.iter_du("/a")) == {"/a/e": 584, "/a": 94853}
+    assert dict(file_system.iter_du()) == {
+        "/a/e": 584, "/a": 94853, "/d": 24933642, "/": 48381165}, dict(file_system.iter_du())
+    assert dict(file_system.iter_du("/", max_depth=1)) == {
+        "/a": 94853, "/d": 24933642, "/": 48381165}
+    part1 = sum_flat_directory_sizes(file_system)
+    assert part1 == 95437, part1
+    part2 = find_flat_minimum_size_to_delete(file_system)
+    assert part2 == 24933642, part2
     print("Tests passed!")
 
 
-test()
-problem_input = get_input()
-tree = build_tree(problem_input)
-print(sum_directory_sizes(tree))
-print(find_minimum_size_to_delete(tree))
+def main():
+    """Solve Advent of Code day 7."""
+    tree = build_flat_tree(loader.iter_text_lines(loader.input_path(7)))
+    print(sum_flat_directory_sizes(tree))
+    print(find_flat_minimum_size_to_delete(tree))
+
+
+if __name__ == "__main__":
+    test()
+    main()
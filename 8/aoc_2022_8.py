@@ -1,12 +1,25 @@
-"""Solution to AOC Day 7."""
+"""Solution to AOC Day 8."""
 
+import heapq
+import os
+import sys
+import tempfile
+from array import array
 from collections import defaultdict
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
+
 
 def get_input():
     """Read problem input."""
-    with open("day8_input.txt", encoding="utf-8") as f:
-        return f.readlines()
+    return loader.read_lines(loader.input_path(8))
 
 
 def parse(problem_input):
@@ -102,6 +115,364 @@ def all_scenic_scores(grid):
     return horizontal_scenic_scores(transpose(grid), scenic_scores, transposed=True)
 
 
+DIGIT_HEIGHTS = bytes.maketrans(b"0123456789", bytes(range(10)))
+
+
+def parse_flat(problem_input):
+    """Parse problem input into a flat row-major bytearray of tree heights.
+    Returns the heights along with the number of rows and columns."""
+    rows = [row.rstrip("\n").encode("ascii") for row in problem_input]
+    rows = [row for row in rows if row]
+    heights = bytearray(b"".join(rows).translate(DIGIT_HEIGHTS))
+    return heights, len(rows), len(rows[0])
+
+
+def parse_flat_bytes(problem_input_bytes):
+    """Parse raw problem input bytes into a flat row-major bytearray of tree heights, without
+    decoding or splitting lines. Returns the heights along with the number of rows and columns."""
+    first_line_end = problem_input_bytes.find(b"\n")
+    if first_line_end == -1:
+        first_line_end = len(problem_input_bytes)
+    n_cols = len(problem_input_bytes[:first_line_end].rstrip(b"\r"))
+    heights = bytearray(problem_input_bytes.translate(DIGIT_HEIGHTS, b"\r\n"))
+    return heights, len(heights) // n_cols, n_cols
+
+
+def _grid_lines(n_rows, n_cols):
+    """Yield flat index ranges for every row and column, in both viewing directions."""
+    size = n_rows * n_cols
+    for i in range(n_rows):
+        row = range(i * n_cols, (i + 1) * n_cols)
+        yield row
+        yield row[::-1]
+    for j in range(n_cols):
+        column = range(j, size, n_cols)
+        yield column
+        yield column[::-1]
+
+
+def _numpy_visibility(heights, n_rows, n_cols):
+    """Compute tree visibility flags with NumPy running-max sweeps."""
+    grid = np.frombuffer(bytes(heights), dtype=np.uint8).reshape(n_rows, n_cols).astype(np.int8)
+
+    def visible_from_start(view):
+        """Flag trees taller than every tree before them along axis 1."""
+        previous_max = np.full_like(view, -1)
+        previous_max[:, 1:] = np.maximum.accumulate(view, axis=1)[:, :-1]
+        return view > previous_max
+
+    visible = visible_from_start(grid)
+    visible |= visible_from_start(grid[:, ::-1])[:, ::-1]
+    visible |= visible_from_start(grid.T).T
+    visible |= visible_from_start(grid.T[:, ::-1])[:, ::-1].T
+    return bytearray(visible.astype(np.uint8).tobytes())
+
+
+def forest_visibility(heights, n_rows, n_cols):
+    """Compute a flat bytearray flagging every tree visible from outside the grid.
+    Each row and column is swept once per direction with a running maximum."""
+    if np is not None:
+        return _numpy_visibility(heights, n_rows, n_cols)
+    visible = bytearray(n_rows * n_cols)
+    for line in _grid_lines(n_rows, n_cols):
+        running_max = -1
+        for index in line:
+            if heights[index] > running_max:
+                visible[index] = 1
+                running_max = heights[index]
+                if running_max == 9:
+                    break
+    return visible
+
+
+def _multiply_row_distances(band, scores):
+    """Multiply scores by the viewing distances to the left and to the right of every tree in a
+    band of rows."""
+    n_cols = band.shape[1]
+    cols = np.arange(n_cols, dtype=np.int32)[None, :]
+    cols_to_right_edge = n_cols - 1 - cols
+    left = np.zeros(band.shape, dtype=np.int32)
+    right = np.zeros(band.shape, dtype=np.int32)
+    nearest = np.empty(band.shape, dtype=np.int32)
+    # Boolean masks are multiplied in rather than used with np.where, which is much faster.
+    for height in range(10):
+        at_least = band >= height
+        is_height = band == height
+        # Nearest tree at least this tall to the left and to the right, defaulting to the edges.
+        nearest[:, 0] = 0
+        np.maximum.accumulate(at_least[:, :-1] * cols[:, :-1], axis=1, out=nearest[:, 1:])
+        left += is_height * (cols - nearest)
+        nearest[:, -1] = n_cols - 1
+        np.minimum.accumulate(n_cols - 1 - at_least[:, :0:-1] * cols_to_right_edge[:, :0:-1],
+                              axis=1, out=nearest[:, -2::-1])
+        right += is_height * (nearest - cols)
+    scores *= left
+    scores *= right
+
+
+def _multiply_up_distances(band, first_row, blockers_above, scores):
+    """Multiply scores by the viewing distance up of every tree in a band of rows.
+
+    blockers_above[d] holds, per column, the last row above the band with a tree of height at
+    least d (0 if there is none), and is updated in place.
+    """
+    rows = np.arange(first_row, first_row + band.shape[0])[:, None]
+    up = np.zeros(band.shape, dtype=np.int64)
+    nearest = np.empty(band.shape, dtype=np.int64)
+    for height in range(10):
+        at_least = band >= height
+        nearest[0] = blockers_above[height]
+        np.maximum.accumulate(at_least[:-1] * rows[:-1], axis=0, out=nearest[1:])
+        np.maximum(nearest, blockers_above[height], out=nearest)
+        blockers_above[height] = np.maximum(nearest[-1], at_least[-1] * rows[-1])
+        up += (band == height) * (rows - nearest)
+    scores *= up
+
+
+def _band_view_distances(band, first_row, blockers_above):
+    """Compute the product of the viewing distances to the left, to the right and up of every
+    tree in a band of rows, its viewing distance down, and whether it is visible from the left
+    or the right.
+
+    blockers_above is updated as in _multiply_up_distances. Down distances only cover the trees
+    flagged as blocked below within the band.
+    """
+    n_band_rows = band.shape[0]
+    rows = np.arange(first_row, first_row + n_band_rows)[:, None]
+    no_blocker = np.iinfo(np.int64).max
+    scores = np.ones(band.shape, dtype=np.int64)
+    _multiply_row_distances(band, scores)
+    _multiply_up_distances(band, first_row, blockers_above, scores)
+    down = np.zeros(band.shape, dtype=np.int64)
+    blocked_below = np.zeros(band.shape, dtype=bool)
+    nearest = np.empty(band.shape, dtype=np.int64)
+    for height in range(10):
+        # Nearest tree at least this tall below, within this band only.
+        blockers = np.minimum.accumulate(np.where(band >= height, rows, no_blocker)[::-1], axis=0)
+        nearest[:-1] = blockers[::-1][1:]
+        nearest[-1] = no_blocker
+        is_blocked = (band == height) & (nearest != no_blocker)
+        blocked_below |= is_blocked
+        np.subtract(nearest, rows, out=down, where=is_blocked)
+    visible = np.empty(band.shape, dtype=bool)
+    visible[:, 1:] = band[:, 1:] > np.maximum.accumulate(band, axis=1)[:, :-1]
+    visible[:, 0] = True
+    from_right = band[:, ::-1]
+    visible[:, ::-1][:, 1:] |= from_right[:, 1:] > np.maximum.accumulate(from_right, axis=1)[:, :-1]
+    visible[:, -1] = True
+    return scores, down, blocked_below, visible
+
+
+# Rough peak working memory per tree while a band is being analyzed.
+BAND_BYTES_PER_TREE = 128
+
+
+def _line_distance_products(grid, band_bytes):
+    """Compute the product of the viewing distances in both directions along each row of a grid.
+
+    For every height, the trees at least that tall are listed in flat row-major order. A tree of
+    that height sits in the list itself, so the trees blocking its view are simply its
+    neighbours in the list, unless they are in another row and the view reaches the edge.
+    """
+    n_lines, length = grid.shape
+    products = np.empty(grid.shape, dtype=np.int64)
+    band_lines = max(1, band_bytes // (BAND_BYTES_PER_TREE * max(1, length)))
+    for first_line in range(0, n_lines, band_lines):
+        band = np.ascontiguousarray(grid[first_line:first_line + band_lines]).ravel()
+        band_products = products[first_line:first_line + band_lines].reshape(-1)
+        for height in range(10):
+            trees = np.flatnonzero(band == height)
+            if not trees.size:
+                continue
+            at_least = band >= height
+            blockers = np.flatnonzero(at_least)
+            ranks = np.cumsum(at_least)[trees] - 1
+            line_starts = trees - trees % length
+            line_ends = line_starts + length - 1
+            previous = blockers[np.maximum(ranks - 1, 0)]
+            previous = np.where((ranks > 0) & (previous >= line_starts), previous, line_starts)
+            following = blockers[np.minimum(ranks + 1, len(blockers) - 1)]
+            following = np.where((ranks + 1 < len(blockers)) & (following <= line_ends),
+                                 following, line_ends)
+            band_products[trees] = (trees - previous) * (following - trees)
+    return products
+
+
+def _numpy_scenic_scores(heights, n_rows, n_cols, band_bytes=256 << 20):
+    """Compute scenic scores with NumPy, one height at a time, for the rows and then for the
+    columns of the grid, in bands of about band_bytes of working memory."""
+    grid = np.frombuffer(bytes(heights), dtype=np.uint8).reshape(n_rows, n_cols)
+    scores = _line_distance_products(grid, band_bytes)
+    scores *= _line_distance_products(grid.T, band_bytes).T
+    return array("q", scores.tobytes())
+
+
+def forest_scenic_scores(heights, n_rows, n_cols):
+    """Compute a flat array of scenic scores for every tree in the grid.
+
+    Viewing distances along each row and column come from a monotonic stack of the trees that
+    are still able to block the view, so every tree is pushed and popped once per direction.
+    With NumPy, whole bands of rows are swept at once instead.
+    """
+    if np is not None:
+        return _numpy_scenic_scores(heights, n_rows, n_cols)
+    scores = array("q", [1]) * (n_rows * n_cols)
+    for line in _grid_lines(n_rows, n_cols):
+        stack = []
+        for position, index in enumerate(line):
+            height = heights[index]
+            while stack and heights[line[stack[-1]]] < height:
+                stack.pop()
+            scores[index] *= position - stack[-1] if stack else position
+            stack.append(position)
+    return scores
+
+
+def forest_grid_view(buffer):
+    """View a forest buffer, such as one from loader.map_input, as a read-only (n_rows, n_cols)
+    uint8 grid of ASCII digits without copying it. Requires NumPy."""
+    if np is None:
+        raise Exception("Out-of-core forest analysis requires NumPy")
+    first_line_end = buffer.find(b"\n")
+    if first_line_end == -1:
+        first_line_end = len(buffer)
+    n_cols = len(buffer[:first_line_end].rstrip(b"\r"))
+    stride = first_line_end + 1
+    n_rows = (len(buffer) - n_cols) // stride + 1 if n_cols else 0
+    flat = np.frombuffer(buffer, dtype=np.uint8)
+    return np.lib.stride_tricks.as_strided(flat, shape=(n_rows, n_cols), strides=(stride, 1))
+
+
+def analyze_forest_out_of_core(path, band_bytes=64 << 20):
+    """Count the visible trees and find the maximum scenic score of a forest file in a single
+    sequential pass over a memory map, analyzing bands of rows in about band_bytes of memory.
+
+    Between bands only per-column state is carried: the running maximum height, the last row
+    with a tree of each height, and the trees still waiting for a tree at least as tall below
+    them. Those pending trees get strictly shorter going down a column, so there is at most one
+    per height and column, and their view down and visibility from the bottom are settled once
+    a blocking tree shows up or the forest ends.
+    """
+    with loader.map_input(path) as buffer:
+        # The grid is never bound here, so no view of the map is left once it is closed.
+        return _analyze_forest_grid(forest_grid_view(buffer), band_bytes)
+
+
+def _analyze_forest_grid(grid, band_bytes):
+    """Run analyze_forest_out_of_core on a grid from forest_grid_view."""
+    n_rows, n_cols = grid.shape
+    band_rows = max(1, band_bytes // (BAND_BYTES_PER_TREE * max(1, n_cols)))
+    column_max = np.full(n_cols, -1, dtype=np.int8)
+    blockers_above = np.zeros((10, n_cols), dtype=np.int64)
+    pending_rows = np.full((10, n_cols), -1, dtype=np.int64)
+    pending_scores = np.zeros((10, n_cols), dtype=np.int64)
+    pending_hidden = np.zeros((10, n_cols), dtype=bool)
+    visible_count = 0
+    max_scenic_score = 0
+    for first_row in range(0, n_rows, band_rows):
+        band = grid[first_row:first_row + band_rows].astype(np.int8) - ord("0")
+        # Settle the trees left pending by earlier bands.
+        for height in range(10):
+            at_least = band >= height
+            blocked = at_least.any(axis=0)
+            settled = blocked & (pending_rows[height] != -1)
+            if settled.any():
+                blocking_row = first_row + at_least.argmax(axis=0)
+                scores = pending_scores[height] * (blocking_row - pending_rows[height])
+                max_scenic_score = max(max_scenic_score, int(scores[settled].max()))
+                visible_count += int((settled & ~pending_hidden[height]).sum())
+                pending_rows[height][settled] = -1
+        scores, down, blocked_below, visible = _band_view_distances(band, first_row, blockers_above)
+        previous_max = np.maximum.accumulate(np.vstack((column_max, band)), axis=0)[:-1]
+        visible |= band > previous_max
+        column_max = np.maximum(column_max, band.max(axis=0))
+        visible_count += int((visible & blocked_below).sum())
+        if blocked_below.any():
+            max_scenic_score = max(max_scenic_score, int((scores * down)[blocked_below].max()))
+        # Trees without a blocking tree below them in this band become pending.
+        band_rows_index, band_cols_index = np.nonzero(~blocked_below)
+        heights = band[band_rows_index, band_cols_index]
+        pending_rows[heights, band_cols_index] = first_row + band_rows_index
+        pending_scores[heights, band_cols_index] = scores[band_rows_index, band_cols_index]
+        pending_hidden[heights, band_cols_index] = ~visible[band_rows_index, band_cols_index]
+    # Trees still pending can see all the way to the bottom edge, and are visible from it.
+    waiting = pending_rows != -1
+    if waiting.any():
+        scores = pending_scores * (n_rows - 1 - pending_rows)
+        max_scenic_score = max(max_scenic_score, int(scores[waiting].max()))
+    visible_count += int(waiting.sum())
+    return visible_count, max_scenic_score
+
+
+def _edge_distance_products(length):
+    """Get (edge distance product, position) pairs for a row or column of the given length,
+    sorted by decreasing product. The product i * (length - 1 - i) bounds the product of a
+    tree's viewing distances in both directions along the line."""
+    return sorted(((i * (length - 1 - i), i) for i in range(length)), reverse=True)
+
+
+def _viewing_distance(heights, index, step, max_distance, height):
+    """Walk from a tree in steps of step flat indices until a tree at least as tall blocks the
+    view or max_distance trees have been passed."""
+    distance = 0
+    while distance < max_distance:
+        distance += 1
+        index += step
+        if heights[index] >= height:
+            break
+    return distance
+
+
+def top_scenic_scores(heights, n_rows, n_cols, k=1):
+    """Find the k highest scenic scores in the grid, as (score, (row, column)) pairs in
+    decreasing order of score. Use this when the positions of the best trees are needed; the
+    maximum score alone is max(forest_scenic_scores(...)).
+
+    A tree's score is at most the product of its distances to the four edges. Trees are visited
+    in decreasing order of that bound, generated lazily from the rows and columns sorted by their
+    own edge distance products, and the search stops as soon as the k-th best exact score is at
+    least every remaining bound. Apart from the sorted rows and columns only O(k) scores are
+    kept, and a score is abandoned as soon as its partial product can no longer make the top k.
+    """
+    row_bounds = _edge_distance_products(n_rows)
+    col_bounds = _edge_distance_products(n_cols)
+    best = []
+    # Frontier of (negated bound, position in row_bounds, position in col_bounds). Each position
+    # pair is pushed once: right from any pair, and down only from the first column.
+    frontier = [(-row_bounds[0][0] * col_bounds[0][0], 0, 0)]
+    while frontier:
+        negated_bound, row_position, col_position = heapq.heappop(frontier)
+        if len(best) == k and best[0][0] >= -negated_bound:
+            break
+        if col_position + 1 < n_cols:
+            heapq.heappush(frontier, (
+                -row_bounds[row_position][0] * col_bounds[col_position + 1][0],
+                row_position, col_position + 1))
+        if col_position == 0 and row_position + 1 < n_rows:
+            heapq.heappush(frontier, (-row_bounds[row_position + 1][0] * col_bounds[0][0],
+                                      row_position + 1, 0))
+        i = row_bounds[row_position][1]
+        j = col_bounds[col_position][1]
+        index = i * n_cols + j
+        height = heights[index]
+        threshold = best[0][0] if len(best) == k else -1
+        score = 1
+        for step, max_distance, remaining_bound in (
+                (-1, j, (n_cols - 1 - j) * i * (n_rows - 1 - i)),
+                (1, n_cols - 1 - j, i * (n_rows - 1 - i)),
+                (-n_cols, i, n_rows - 1 - i),
+                (n_cols, n_rows - 1 - i, 1)):
+            score *= _viewing_distance(heights, index, step, max_distance, height)
+            if score * remaining_bound <= threshold:
+                break
+        else:
+            if len(best) < k:
+                heapq.heappush(best, (score, (i, j)))
+            else:
+                heapq.heappushpop(best, (score, (i, j)))
+    return sorted(best, reverse=True)
+
+
 EXAMPLE_INPUT = """30373
 25512
 65332
@@ -116,15 +487,38 @@ def test():
     assert count == 21, count
     max_scenic_score = max(all_scenic_scores(trees).values())
     assert max_scenic_score == 8, max_scenic_score
+    heights, n_rows, n_cols = parse_flat(EXAMPLE_INPUT.split("\n"))
+    count = sum(forest_visibility(heights, n_rows, n_cols))
+    assert count == 21, count
+    max_scenic_score = max(forest_scenic_scores(heights, n_rows, n_cols))
+    assert max_scenic_score == 8, max_scenic_score
+    expected_scores = all_scenic_scores(trees)
+    scores = forest_scenic_scores(heights, n_rows, n_cols)
+    assert list(scores) == [expected_scores[divmod(index, n_cols)] for index in range(len(scores))]
+    if np is not None:
+        assert _numpy_scenic_scores(heights, n_rows, n_cols, band_bytes=1) == scores
+    flat_grid = parse_flat_bytes(EXAMPLE_INPUT.encode("ascii"))
+    assert flat_grid == (heights, n_rows, n_cols), flat_grid
+    top_scores = top_scenic_scores(heights, n_rows, n_cols, k=2)
+    assert top_scores == [(8, (3, 2)), (6, (2, 1))], top_scores
+    if np is not None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "forest.txt")
+            with open(path, "w", encoding="ascii") as f:
+                f.write(EXAMPLE_INPUT + "\n")
+            for band_bytes in (1, 1 << 20):
+                result = analyze_forest_out_of_core(path, band_bytes=band_bytes)
+                assert result == (21, 8), result
     print("Tests passed!")
 
 
 def main():
     """Solve day 8."""
-    trees = parse(get_input())
-    print(len(all_visible_indices(trees)))
-    print(max(all_scenic_scores(trees).values()))
+    heights, n_rows, n_cols = parse_flat_bytes(loader.read_bytes(loader.input_path(8)))
+    print(sum(forest_visibility(heights, n_rows, n_cols)))
+    print(max(forest_scenic_scores(heights, n_rows, n_cols)))
 
 
-test()
-main()
+if __name__ == "__main__":
+    test()
+    main()
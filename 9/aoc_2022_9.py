@@ -1,7 +1,13 @@
 """Advent of code day 9."""
 
+import os
+import sys
 from collections import namedtuple
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aoc2022 import loader  # pylint: disable=wrong-import-position
+
 class Position(namedtuple("Position", ["x", "y"])):
     """Basic position class with an x and y coordinate."""
 
@@ -24,8 +30,7 @@ class Position(namedtuple("Position", ["x", "y"])):
 
 def get_input():
     """Read problem input."""
-    with open("day9_input.txt", encoding="utf-8") as f:
-        return f.readlines()
+    return loader.read_lines(loader.input_path(9))
 
 
 DIRECTIONS_MAP = {
@@ -81,6 +86,75 @@ def process_moves(moves, rope_length=2):
     return visited
 
 
+def _follow_step(dx, dy):
+    """Compute the step a knot takes given its offset (dx, dy) to the knot it follows."""
+    if abs(dx) <= 1 and abs(dy) <= 1:
+        return None
+    return clamp(dx, -1, 1), clamp(dy, -1, 1)
+
+
+# Steps taken by a following knot, indexed by (dx + 2) * 5 + (dy + 2) where (dx, dy) is its
+# offset to the knot ahead of it. None means the knot does not move.
+FOLLOW_STEPS = [_follow_step(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3)]
+
+
+def pack_position(x, y):
+    """Pack a position into a single integer. Unique for |y| < 2**31."""
+    return (x << 32) + y
+
+
+def _rope_steps(moves, rope_length):
+    """Move the head of a rope one step at a time, with every other knot following the knot
+    ahead of it. Yields the knot x and y coordinate lists after each step; the same lists are
+    updated in place, so copy them to keep a position."""
+    xs = [0] * rope_length
+    ys = [0] * rope_length
+    for direction, steps in moves:
+        head_dx, head_dy = direction
+        for _ in range(steps):
+            xs[0] += head_dx
+            ys[0] += head_dy
+            for knot in range(1, rope_length):
+                step = FOLLOW_STEPS[(xs[knot - 1] - xs[knot] + 2) * 5 + ys[knot - 1] - ys[knot] + 2]
+                if step is None:
+                    # Knots further down the rope cannot move if this one did not.
+                    break
+                xs[knot] += step[0]
+                ys[knot] += step[1]
+            yield xs, ys
+
+
+def simulate_rope(moves, rope_length=2):
+    """Process the list of moves with knot coordinates kept in flat integer lists.
+    Returns a set of the packed positions (see pack_position) the tail visited."""
+    tail_index = rope_length - 1
+    visited = {pack_position(0, 0)}
+    for xs, ys in _rope_steps(moves, rope_length):
+        visited.add((xs[tail_index] << 32) + ys[tail_index])
+    return visited
+
+
+def count_visited_by_rope_length(moves, max_rope_length=10, rope_lengths=None):
+    """Count the positions visited by the tail of every rope of length 2 to max_rope_length,
+    with a single simulation of the longest rope.
+
+    Knot i of a long rope moves exactly like the tail of a rope of length i + 1, so a visited
+    set is kept per knot. Returns a dict from rope length to visited position count. Pass
+    rope_lengths to only keep visited sets for those lengths, which saves a set insertion per
+    step for every other knot.
+    """
+    if rope_lengths is None:
+        rope_lengths = range(2, max_rope_length + 1)
+    tracked = [length - 1 for length in rope_lengths]
+    if any(not 1 <= knot < max_rope_length for knot in tracked):
+        raise Exception(f"Rope lengths must be between 2 and {max_rope_length}: {rope_lengths}")
+    visited = {knot: {pack_position(0, 0)} for knot in tracked}
+    for xs, ys in _rope_steps(moves, max_rope_length):
+        for knot, knot_visited in visited.items():
+            knot_visited.add((xs[knot] << 32) + ys[knot])
+    return {knot + 1: len(knot_visited) for knot, knot_visited in visited.items()}
+
+
 EXAMPLE_INPUT = """R 4
 U 4
 L 3
@@ -110,15 +184,28 @@ def test():
     visited = process_moves(moves, rope_length=10)
     num_visited = len(visited)
     assert num_visited == 36, sorted(visited)
+    num_visited = len(simulate_rope(moves, rope_length=10))
+    assert num_visited == 36, num_visited
+    moves = parse_moves(EXAMPLE_INPUT.split("\n"))
+    num_visited = len(simulate_rope(moves))
+    assert num_visited == 13, num_visited
+    counts = count_visited_by_rope_length(moves)
+    assert counts[2] == 13 and counts[10] == 1, counts
+    moves = parse_moves(LARGER_EXAMPLE_INPUT.split("\n"))
+    counts = count_visited_by_rope_length(moves)
+    assert counts == {length: len(simulate_rope(moves, length)) for length in range(2, 11)}, counts
+    assert count_visited_by_rope_length(moves, rope_lengths=(2, 10)) == {2: 88, 10: 36}
     print("Tests passed!")
 
 
 def main():
     """Advent of Code day 9 solution."""
     moves = parse_moves(get_input())
-    print(len(process_moves(moves)))
-    print(len(process_moves(moves, rope_length=10)))
+    counts = count_visited_by_rope_length(moves, max_rope_length=10, rope_lengths=(2, 10))
+    print(counts[2])
+    print(counts[10])
 
 
-test()
-main()
+if __name__ == "__main__":
+    test()
+    main()
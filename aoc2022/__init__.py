@@ -0,0 +1 @@
+"""Shared utilities for the Advent of Code 2022 solutions."""
@@ -0,0 +1,50 @@
+"""Command line entry point: python -m aoc2022 run [DAY ...] [--parallel]."""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from aoc2022.days import DAYS
+from aoc2022.runner import format_result, run_days
+
+
+def main(argv=None):
+    """Parse command line arguments and run the requested command."""
+    parser = argparse.ArgumentParser(prog="python -m aoc2022")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="solve the given days (default: all)")
+    run_parser.add_argument("days", nargs="*", type=int, default=list(DAYS))
+    run_parser.add_argument("--parallel", action="store_true",
+                            help="solve the days concurrently in a process pool")
+    run_parser.add_argument("--workers", type=int, help="maximum number of worker processes")
+    run_parser.add_argument("--input-dir",
+                            help="directory containing dayN_input.txt files (default: the "
+                                 "AOC_DAY<N>_INPUT environment variable or the working directory)")
+    run_parser.add_argument("--instrument", metavar="FILE",
+                            help="collect per-phase timers and algorithm counters as JSON")
+    run_parser.add_argument("--profile-dir",
+                            help="write a cProfile dump for each day to DIR/dayN.prof")
+    args = parser.parse_args(argv)
+
+    unknown_days = [day for day in args.days if day not in DAYS]
+    if unknown_days:
+        parser.error(f"no solution for day(s) {', '.join(map(str, unknown_days))}")
+    if args.profile_dir is not None:
+        os.makedirs(args.profile_dir, exist_ok=True)
+    start = time.perf_counter()
+    results = []
+    for result in run_days(args.days, args.input_dir, args.parallel, args.workers,
+                           args.instrument is not None, args.profile_dir):
+        print(format_result(result))
+        results.append(result)
+    if args.instrument is not None:
+        with open(args.instrument, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, default=str)
+    print(f"Total: {(time.perf_counter() - start) * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""Benchmark the parse and solve phases of every day at several input scales.
+
+Scaled inputs are built from each day's puzzle input, found the same way the solutions find
+it (the AOC_DAY<N>_INPUT environment variable or dayN_input.txt), and every phase is timed
+separately. Results are written as JSON, and can be compared against a saved baseline:
+
+    python -m aoc2022.benchmark 1 8 9 --scales 1 10 100 --output baseline.json
+    python -m aoc2022.benchmark 1 8 9 --scales 1 10 100 --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from aoc2022 import loader
+from aoc2022.days import DAYS, SOLVERS, load_day
+
+DEFAULT_SCALES = (1, 10, 100, 1000)
+DEFAULT_THRESHOLD = 1.25
+
+
+def _repeat_lines(text, factor):
+    """Scale a line-oriented input by repeating all of its lines."""
+    return (text.rstrip("\n") + "\n") * factor
+
+
+def _scale_elf_inventories(text, factor):
+    """Scale a day 1 input by repeating every elf's inventory."""
+    return (text.rstrip("\n") + "\n\n") * factor
+
+
+def _scale_crane_moves(text, factor):
+    """Scale a day 5 input to factor times the moves by undoing and redoing them, which keeps
+    every move valid. Even factors end with an undo pass."""
+    stacks_string, moves_string = text.rstrip("\n").split("\n\n")
+    moves = moves_string.split("\n")
+    undo_moves = []
+    for move in reversed(moves):
+        words = move.split(" ")
+        undo_moves.append(f"move {words[1]} from {words[5]} to {words[3]}")
+    all_moves = moves + (undo_moves + moves) * ((factor - 1) // 2)
+    if factor % 2 == 0:
+        all_moves += undo_moves
+    return stacks_string + "\n\n" + "\n".join(all_moves) + "\n"
+
+
+def _scale_packet(text, factor):
+    """Scale a day 6 input by prefixing it with a long stretch containing no marker."""
+    packet = text.strip()
+    return "ab" * (len(packet) * (factor - 1) // 2) + packet + "\n"
+
+
+def _scale_terminal_log(text, factor):
+    """Scale a day 7 input by replaying the whole log inside new top-level directories."""
+    lines = text.rstrip("\n").split("\n")
+    scaled_lines = list(lines)
+    for copy in range(1, factor):
+        scaled_lines += ["$ cd /", f"$ cd copy{copy}"] + lines[1:]
+    return "\n".join(scaled_lines) + "\n"
+
+
+def _scale_forest(text, factor):
+    """Scale a day 8 input by tiling the forest horizontally."""
+    return "".join(row * factor + "\n" for row in text.split())
+
+
+def _scale_monkey_items(text, factor):
+    """Scale a day 11 input by repeating every monkey's starting items."""
+    prefix = "  Starting items: "
+    lines = []
+    for line in text.rstrip("\n").split("\n"):
+        if line.startswith(prefix):
+            line = prefix + ", ".join(line[len(prefix):].split(", ") * factor)
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def _scale_height_map(text, factor):
+    """Scale a day 12 input by tiling the map horizontally, keeping a single start and end."""
+    rows = text.split()
+    return "".join(
+        row + row.replace("S", "a").replace("E", "z") * (factor - 1) + "\n" for row in rows)
+
+
+SCALERS = {
+    1: _scale_elf_inventories,
+    2: _repeat_lines,
+    3: _repeat_lines,
+    4: _repeat_lines,
+    5: _scale_crane_moves,
+    6: _scale_packet,
+    7: _scale_terminal_log,
+    8: _scale_forest,
+    9: _repeat_lines,
+    10: _repeat_lines,
+    11: _scale_monkey_items,
+    12: _scale_height_map,
+}
+
+
+def _run_phases(solver, module, path, trace_memory):
+    """Run the phases of a day once, returning (seconds, peak memory bytes) per phase."""
+    measurements = {}
+    parsed = None
+    phases = (
+        ("parse", lambda: solver.parse(module, path)),
+        ("part_1", lambda: solver.part_1(module, parsed)),
+        ("part_2", lambda: solver.part_2(module, parsed)),
+    )
+    for phase_name, phase in phases:
+        if trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = phase()
+        seconds = time.perf_counter() - start
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if phase_name == "parse":
+            parsed = result
+        measurements[phase_name] = (seconds, peak_memory)
+    return measurements
+
+
+def benchmark_day(day, scales=DEFAULT_SCALES, repeat=1, work_dir=None):
+    """Benchmark a single day at each scale, returning a list of JSON-serializable results.
+
+    Each phase's time is the best of repeat runs. Peak memory is measured in a separate run
+    under tracemalloc so that tracing does not skew the timings.
+    """
+    solver = SOLVERS[day]
+    base_path = loader.input_path(day, argv=[])
+    if not os.path.exists(base_path):
+        return [{"day": day, "skipped": f"input file {base_path} not found"}]
+    module = load_day(day)
+    base_text = loader.read_text(base_path)
+    results = []
+    with tempfile.TemporaryDirectory(dir=work_dir) as scaled_dir:
+        for scale in scales:
+            path = os.path.join(scaled_dir, f"day{day}_x{scale}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(SCALERS[day](base_text, scale))
+            input_bytes = os.path.getsize(path)
+            best_seconds = {}
+            for _ in range(repeat):
+                for phase_name, (seconds, _) in _run_phases(solver, module, path, False).items():
+                    best_seconds[phase_name] = min(seconds, best_seconds.get(phase_name, seconds))
+            tracemalloc.start()
+            try:
+                memory_measurements = _run_phases(solver, module, path, True)
+            finally:
+                tracemalloc.stop()
+            phases = {}
+            for phase_name, seconds in best_seconds.items():
+                phases[phase_name] = {
+                    "seconds": seconds,
+                    "bytes_per_second": input_bytes / seconds if seconds > 0 else None,
+                    "peak_memory_bytes": memory_measurements[phase_name][1],
+                }
+            results.append({
+                "day": day,
+                "scale": scale,
+                "input_bytes": input_bytes,
+                "phases": phases,
+            })
+            os.remove(path)
+    return results
+
+
+def compare_to_baseline(results, baseline_results, threshold=DEFAULT_THRESHOLD):
+    """Find phases that got slower than the baseline by more than the threshold ratio.
+    Returns a list of JSON-serializable regressions."""
+    baseline_phases = {}
+    for result in baseline_results:
+        for phase_name, phase in result.get("phases", {}).items():
+            baseline_phases[(result["day"], result["scale"], phase_name)] = phase["seconds"]
+    regressions = []
+    for result in results:
+        for phase_name, phase in result.get("phases", {}).items():
+            baseline_seconds = baseline_phases.get((result["day"], result["scale"], phase_name))
+            if not baseline_seconds:
+                continue
+            ratio = phase["seconds"] / baseline_seconds
+            if ratio > threshold:
+                regressions.append({
+                    "day": result["day"],
+                    "scale": result["scale"],
+                    "phase": phase_name,
+                    "seconds": phase["seconds"],
+                    "baseline_seconds": baseline_seconds,
+                    "ratio": ratio,
+                })
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmarks from the command line. Returns the process exit code."""
+    parser = argparse.ArgumentParser(prog="python -m aoc2022.benchmark", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("days", nargs="*", type=int, default=list(DAYS),
+                        help="days to benchmark (default: all)")
+    parser.add_argument("--scales", nargs="+", type=int, default=list(DEFAULT_SCALES),
+                        help="input scale factors (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="runs per phase, keeping the fastest (default: %(default)s)")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="compare against results saved with --output")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown ratio flagged as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for day in args.days:
+        results.extend(benchmark_day(day, args.scales, args.repeat))
+    report = {"python": sys.version, "results": results}
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline_results = json.load(f)["results"]
+        report["regressions"] = compare_to_baseline(results, baseline_results, args.threshold)
+        if report["regressions"]:
+            exit_code = 1
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report_json + "\n")
+    print(report_json)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Locate, import and solve each day without running its script code."""
+
+import importlib.util
+import os
+import sys
+from collections import namedtuple
+
+from aoc2022 import loader
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DAYS = tuple(range(1, 13))
+
+
+def module_path(day):
+    """Get the path of the solution module for the given day."""
+    return os.path.join(REPO_ROOT, str(day), f"aoc_2022_{day}.py")
+
+
+def load_day(day):
+    """Import the solution module for the given day, reusing it if already imported."""
+    if day not in DAYS:
+        raise ValueError(f"No solution for day {day}.")
+    name = f"aoc_2022_{day}"
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, module_path(day))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+Solver = namedtuple("Solver", ["parse", "part_1", "part_2"])
+Solver.__doc__ = """How to solve a day in phases. parse(module, path) parses the input file, and
+part_1/part_2(module, parsed) solve each part from the parsed input."""
+
+
+def _solve_rucksacks(module, path):
+    """Solve both parts of day 3 from the memory mapped input, without a list of its lines."""
+    with loader.map_input(path) as buffer:
+        return (module.sum_rucksack_mask_priorities(loader.iter_lines(buffer)),
+                module.sum_elf_group_badge_mask_priorities(loader.iter_lines(buffer)))
+
+
+def _solve_monkeys(module, lines, part):
+    """Solve one part of day 11 from freshly parsed monkeys."""
+    monkeys = module.parse_monkeys(lines)
+    if part == 1:
+        monkeys = module.evaluate_rounds_vectorized(monkeys, 20)
+    else:
+        monkeys = module.evaluate_rounds_with_cycle_detection(monkeys, 10000)
+    return module.monkey_business(monkeys)
+
+
+# Days whose parts share a single pass over the input do that pass in the parse phase, and
+# their parts only pick out their own answer.
+SOLVERS = {
+    1: Solver(
+        lambda m, path: m.find_max_calorie_sums(m.stream_elf_totals(path), (1, 3)),
+        lambda m, sums: sums[0],
+        lambda m, sums: sums[1]),
+    2: Solver(
+        lambda m, path: m.count_rounds(loader.read_bytes(path)),
+        lambda m, counts: m.count_score_from_counts(counts, m.SCORE_TABLE_PART_1),
+        lambda m, counts: m.count_score_from_counts(counts, m.SCORE_TABLE_PART_2)),
+    3: Solver(
+        _solve_rucksacks,
+        lambda m, sums: sums[0],
+        lambda m, sums: sums[1]),
+    4: Solver(
+        lambda m, path: list(m.parse(loader.read_lines(path))),
+        lambda m, pairs: sum(
+            m.interval_contains(left, right) or m.interval_contains(right, left)
+            for left, right in pairs),
+        lambda m, pairs: sum(m.intervals_overlap(left, right) for left, right in pairs)),
+    5: Solver(
+        lambda m, path: m.parse(loader.read_text(path)),
+        lambda m, parsed: m.top_crates(m.execute_moves_on_lists(*parsed, crane_model=9000)),
+        lambda m, parsed: m.top_crates(m.execute_moves_on_lists(*parsed, crane_model=9001))),
+    6: Solver(
+        lambda m, path: m.find_start_markers(loader.iter_chunks(path), [4, 14]),
+        lambda m, markers: markers[4],
+        lambda m, markers: markers[14]),
+    7: Solver(
+        lambda m, path: m.build_flat_tree(loader.iter_text_lines(path)),
+        lambda m, tree: m.sum_flat_directory_sizes(tree),
+        lambda m, tree: m.find_flat_minimum_size_to_delete(tree)),
+    8: Solver(
+        lambda m, path: m.parse_flat_bytes(loader.read_bytes(path)),
+        lambda m, grid: sum(m.forest_visibility(*grid)),
+        lambda m, grid: max(m.forest_scenic_scores(*grid))),
+    9: Solver(
+        lambda m, path: m.count_visited_by_rope_length(
+            m.parse_moves(loader.read_lines(path)), 10, rope_lengths=(2, 10)),
+        lambda m, counts: counts[2],
+        lambda m, counts: counts[10]),
+    10: Solver(
+        lambda m, path: m.compile_instructions(loader.read_lines(path)),
+        lambda m, program: m.Emulator().run(*program).signal_strength_sum,
+        lambda m, program: m.Emulator().run(*program).image_string()),
+    11: Solver(
+        lambda m, path: loader.read_lines(path),
+        lambda m, lines: _solve_monkeys(m, lines, part=1),
+        lambda m, lines: _solve_monkeys(m, lines, part=2)),
+    12: Solver(
+        lambda m, path: m.HillMap(*m.parse(loader.read_lines(path))),
+        lambda m, hill_map: hill_map.shortest_path_length(),
+        lambda m, hill_map: hill_map.shortest_path_length_from_lowest()),
+}
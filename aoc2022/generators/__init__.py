@@ -0,0 +1,227 @@
+"""Deterministic generators for large puzzle inputs, one per day.
+
+Every generator takes an open text file, a seeded random.Random and keyword arguments that
+control the size and shape of the input, and writes the input line by line so memory use stays
+bounded however large the output is. The output is valid input for each day's parse functions.
+"""
+
+import random
+import string
+
+LETTERS = string.ascii_lowercase + string.ascii_uppercase
+
+
+def generate_day_1(f, rng, num_elves=1000, max_items=10, max_calories=100_000):
+    """Write elf inventories, separated by blank lines."""
+    for elf in range(num_elves):
+        if elf:
+            f.write("\n")
+        for _ in range(rng.randint(1, max_items)):
+            f.write(f"{rng.randint(1, max_calories)}\n")
+
+
+def generate_day_2(f, rng, num_rounds=10_000):
+    """Write a rock-paper-scissors strategy guide."""
+    for _ in range(num_rounds):
+        f.write(f"{rng.choice('ABC')} {rng.choice('XYZ')}\n")
+
+
+def generate_day_3(f, rng, num_groups=1000, group_size=3, compartment_size=12):
+    """Write rucksacks in groups sharing exactly one badge item, each with exactly one item type
+    in both compartments."""
+    if compartment_size < 2:
+        raise ValueError("compartment_size must be at least 2")
+    for _ in range(num_groups):
+        letters = list(LETTERS)
+        rng.shuffle(letters)
+        badge = letters.pop()
+        # Each elf in the group draws from its own letters, so only the badge is shared.
+        elf_letter_count = len(letters) // group_size
+        if elf_letter_count < 3:
+            raise ValueError("group_size is too large to give every elf distinct items")
+        for elf in range(group_size):
+            elf_letters = letters[elf * elf_letter_count:(elf + 1) * elf_letter_count]
+            duplicate = elf_letters.pop()
+            split = rng.randint(1, len(elf_letters) - 1)
+            left_pool, right_pool = elf_letters[:split], elf_letters[split:]
+            left = [duplicate, badge] + rng.choices(left_pool, k=compartment_size - 2)
+            right = [duplicate] + rng.choices(right_pool, k=compartment_size - 1)
+            rng.shuffle(left)
+            rng.shuffle(right)
+            f.write("".join(left) + "".join(right) + "\n")
+
+
+def generate_day_4(f, rng, num_pairs=1000, max_section=100, max_width=50):
+    """Write pairs of section assignment ranges."""
+    def section_range():
+        start = rng.randint(1, max_section)
+        return f"{start}-{start + rng.randint(0, max_width)}"
+    for _ in range(num_pairs):
+        f.write(f"{section_range()},{section_range()}\n")
+
+
+def generate_day_5(f, rng, num_stacks=9, max_height=20, num_moves=1000, max_move=10):
+    """Write a stack drawing followed by moves that never empty a stack."""
+    heights = [rng.randint(1, max_height) for _ in range(num_stacks)]
+    for level in range(max(heights), 0, -1):
+        crates = [f"[{rng.choice(string.ascii_uppercase)}]" if height >= level else "   "
+                  for height in heights]
+        f.write(" ".join(crates) + "\n")
+    f.write(" ".join(f"{stack:^3}" for stack in range(1, num_stacks + 1)) + "\n\n")
+    moves_written = 0
+    while moves_written < num_moves:
+        move_from, move_to = rng.sample(range(num_stacks), 2)
+        if heights[move_from] < 2:
+            continue
+        count = rng.randint(1, min(max_move, heights[move_from] - 1))
+        heights[move_from] -= count
+        heights[move_to] += count
+        f.write(f"move {count} from {move_from + 1} to {move_to + 1}\n")
+        moves_written += 1
+
+
+def generate_day_6(f, rng, length=100_000, prefix_alphabet_size=3, marker_length=14):
+    """Write a packet drawn from a small alphabet, so that the markers only appear at its end."""
+    alphabet = string.ascii_lowercase[:prefix_alphabet_size]
+    chunk_size = 1 << 16
+    remaining = length
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        f.write("".join(rng.choices(alphabet, k=size)))
+        remaining -= size
+    f.write("".join(rng.sample(string.ascii_lowercase, marker_length)) + "\n")
+
+
+def generate_day_7(f, rng, num_dirs=1000, max_depth=20, min_children=0, max_children=4,
+                   max_files=5, max_file_size=300_000):
+    """Write a terminal log exploring a random directory tree depth first.
+    Set min_children and max_children to 1 and max_depth high for a single deep chain."""
+    f.write("$ cd /\n")
+    dirs_left = num_dirs - 1
+    # Stack of the child directory names still to visit at each level.
+    pending = []
+    while True:
+        num_children = 0
+        if len(pending) < max_depth:
+            num_children = min(rng.randint(min_children, max_children), dirs_left)
+        dirs_left -= num_children
+        children = [f"d{index}" for index in range(num_children)]
+        f.write("$ ls\n")
+        for child in children:
+            f.write(f"dir {child}\n")
+        for index in range(rng.randint(0, max_files)):
+            f.write(f"{rng.randint(1, max_file_size)} f{index}.txt\n")
+        pending.append(children[::-1])
+        while pending and not pending[-1]:
+            pending.pop()
+            if pending:
+                f.write("$ cd ..\n")
+        if not pending:
+            return
+        f.write(f"$ cd {pending[-1].pop()}\n")
+
+
+def generate_day_8(f, rng, rows=100, cols=100):
+    """Write a forest of random tree heights."""
+    for _ in range(rows):
+        f.write("".join(rng.choices(string.digits, k=cols)) + "\n")
+
+
+def generate_day_9(f, rng, num_moves=2000, max_steps=20):
+    """Write rope head moves."""
+    for _ in range(num_moves):
+        f.write(f"{rng.choice('UDLR')} {rng.randint(1, max_steps)}\n")
+
+
+def generate_day_10(f, rng, num_instructions=10_000, max_add=5):
+    """Write a CPU program that keeps the X register near the middle of a 40 pixel row."""
+    x = 1
+    for _ in range(num_instructions):
+        if rng.random() < 0.3:
+            f.write("noop\n")
+            continue
+        value = rng.randint(-max_add, max_add)
+        if not 0 <= x + value < 40:
+            value = -value
+        x += value
+        f.write(f"addx {value}\n")
+
+
+def _primes(count):
+    """Get the first count primes."""
+    primes = []
+    candidate = 2
+    while len(primes) < count:
+        if all(candidate % prime for prime in primes if prime * prime <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def generate_day_11(f, rng, num_monkeys=8, items_per_monkey=5, max_worry_level=100,
+                    max_operand=20):
+    """Write monkeys with distinct prime divisibility tests that only throw to other monkeys."""
+    divisors = _primes(num_monkeys)
+    rng.shuffle(divisors)
+    for monkey in range(num_monkeys):
+        if monkey:
+            f.write("\n")
+        items = ", ".join(
+            str(rng.randint(1, max_worry_level)) for _ in range(items_per_monkey))
+        operation = rng.choice(["old * old", f"old * {rng.randint(2, max_operand)}",
+                                f"old + {rng.randint(1, max_operand)}"])
+        on_true, on_false = rng.sample([other for other in range(num_monkeys) if other != monkey],
+                                       2)
+        f.write(f"Monkey {monkey}:\n"
+                f"  Starting items: {items}\n"
+                f"  Operation: new = {operation}\n"
+                f"  Test: divisible by {divisors[monkey]}\n"
+                f"    If true: throw to monkey {on_true}\n"
+                f"    If false: throw to monkey {on_false}\n")
+
+
+def generate_day_12(f, rng, rows=41, cols=100, max_dip=3):
+    """Write a height map rising from S in the top left corner to E in the bottom right corner.
+
+    Heights follow a ramp with random dips, except along the top row and the right column which
+    always form a climbable path from S to E.
+    """
+    diagonal = rows + cols - 2
+    if diagonal < 25:
+        raise ValueError("rows + cols must be at least 27 to climb from a to z")
+    for i in range(rows):
+        row = []
+        for j in range(cols):
+            height = (i + j) * 25 // diagonal
+            if i != 0 and j != cols - 1:
+                height = max(0, height - rng.randint(0, max_dip))
+            row.append(string.ascii_lowercase[height])
+        if i == 0:
+            row[0] = "S"
+        if i == rows - 1:
+            row[-1] = "E"
+        f.write("".join(row) + "\n")
+
+
+GENERATORS = {
+    1: generate_day_1,
+    2: generate_day_2,
+    3: generate_day_3,
+    4: generate_day_4,
+    5: generate_day_5,
+    6: generate_day_6,
+    7: generate_day_7,
+    8: generate_day_8,
+    9: generate_day_9,
+    10: generate_day_10,
+    11: generate_day_11,
+    12: generate_day_12,
+}
+
+
+def write_input(day, path, seed=0, **shape):
+    """Write a generated input for the given day to path. The same seed and shape always give
+    the same output."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        GENERATORS[day](f, rng, **shape)
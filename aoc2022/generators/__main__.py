@@ -0,0 +1,27 @@
+"""Command line entry point: python -m aoc2022.generators DAY OUTPUT [--seed N] [key=value ...]."""
+
+import argparse
+import sys
+
+from aoc2022.generators import GENERATORS, write_input
+
+
+def main(argv=None):
+    """Generate a puzzle input from the command line."""
+    parser = argparse.ArgumentParser(prog="python -m aoc2022.generators")
+    parser.add_argument("day", type=int, choices=sorted(GENERATORS))
+    parser.add_argument("output", help="path of the input file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("shape", nargs="*", metavar="key=value",
+                        help="integer shape parameters, e.g. num_elves=1000000 for day 1")
+    args = parser.parse_args(argv)
+    shape = {}
+    for parameter in args.shape:
+        key, _, value = parameter.partition("=")
+        shape[key] = int(value)
+    write_input(args.day, args.output, args.seed, **shape)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""Opt-in instrumentation: per-phase timers and per-day algorithm counters.
+
+Probes work by temporarily replacing functions on the loader and the day modules, and are
+removed again once the run is over, so nothing is slowed down unless instrumentation is
+requested. Results export as JSON, and the run can also be profiled with cProfile.
+"""
+
+import cProfile
+import functools
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from aoc2022 import loader
+from aoc2022.days import SOLVERS, load_day
+
+# Loader functions that return the whole input, those that return a lazy iterator over it, and
+# those that provide it as a context manager.
+LOADER_READERS = ("read_lines", "read_text", "read_bytes")
+LOADER_ITERATORS = ("iter_chunks", "iter_text_lines")
+LOADER_CONTEXTS = ("map_input",)
+
+
+class Instrumentation:
+    """Collects timers, counters and per-round series during an instrumented run."""
+
+    def __init__(self):
+        """Initialize an empty Instrumentation."""
+        self.timers = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.series = defaultdict(list)
+        self._patches = []
+
+    @contextmanager
+    def timer(self, name):
+        """Add the time spent in the with block to the named timer."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] += time.perf_counter() - start
+
+    def count(self, name, amount=1):
+        """Increase the named counter."""
+        self.counters[name] += amount
+
+    def record(self, name, value):
+        """Append a value to the named series."""
+        self.series[name].append(value)
+
+    def patch(self, owner, attribute, make_wrapper):
+        """Replace owner.attribute with make_wrapper(original) until restore is called."""
+        original = getattr(owner, attribute)
+        self._patches.append((owner, attribute, original))
+        setattr(owner, attribute, make_wrapper(original))
+
+    def restore(self):
+        """Undo every patch, most recent first."""
+        while self._patches:
+            owner, attribute, original = self._patches.pop()
+            setattr(owner, attribute, original)
+
+    def to_dict(self):
+        """Export the collected data as a JSON-serializable dict."""
+        return {
+            "timers": dict(self.timers),
+            "counters": dict(self.counters),
+            "series": dict(self.series),
+        }
+
+
+def _timed_reader(instrumentation, function):
+    """Wrap a loader function so that its time counts towards the get_input timer."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with instrumentation.timer("get_input"):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def _timed_iterator(instrumentation, function):
+    """Wrap a loader iterator so that the time spent producing each item counts towards the
+    get_input timer."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        iterator = iter(function(*args, **kwargs))
+        while True:
+            with instrumentation.timer("get_input"):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    return wrapper
+
+
+def _timed_context(instrumentation, function):
+    """Wrap a loader context manager so that the time spent entering it counts towards the
+    get_input timer."""
+    @functools.wraps(function)
+    @contextmanager
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        with function(*args, **kwargs) as value:
+            instrumentation.timers["get_input"] += time.perf_counter() - start
+            yield value
+    return wrapper
+
+
+def _probe_day_5(instrumentation, module):
+    """Count the crates moved by the crane."""
+    def make_wrapper(execute):
+        @functools.wraps(execute)
+        def wrapper(initial_stacks, moves, *args, **kwargs):
+            instrumentation.count("crates_moved", sum(count for count, _, _ in moves))
+            return execute(initial_stacks, moves, *args, **kwargs)
+        return wrapper
+    instrumentation.patch(module, "execute_moves_on_lists", make_wrapper)
+
+
+def _probe_day_9(instrumentation, module):
+    """Count the steps taken by the head of the rope."""
+    def make_wrapper(simulate):
+        @functools.wraps(simulate)
+        def wrapper(moves, *args, **kwargs):
+            instrumentation.count("rope_steps", sum(steps for _, steps in moves))
+            return simulate(moves, *args, **kwargs)
+        return wrapper
+    instrumentation.patch(module, "simulate_rope", make_wrapper)
+    instrumentation.patch(module, "count_visited_by_rope_length", make_wrapper)
+    instrumentation.patch(module, "process_moves", make_wrapper)
+
+
+def _probe_day_11(instrumentation, module):
+    """Record each monkey's inspections per simulated round, and in total. Rounds skipped by
+    cycle detection are replayed from the detected cycles into a separate series."""
+    def make_vectorized_wrapper(evaluate):
+        @functools.wraps(evaluate)
+        def wrapper(monkeys, num_rounds, divide_worry_levels=True, round_callback=None):
+            previous = [monkey.num_inspections for monkey in monkeys]
+
+            def callback(monkeys):
+                current = [monkey.num_inspections for monkey in monkeys]
+                instrumentation.record(
+                    "inspections_per_round",
+                    [now - before for now, before in zip(current, previous)])
+                previous[:] = current
+                if round_callback is not None:
+                    round_callback(monkeys)
+
+            monkeys = evaluate(monkeys, num_rounds, divide_worry_levels, callback)
+            instrumentation.record("inspections_total",
+                                   [monkey.num_inspections for monkey in monkeys])
+            return monkeys
+        return wrapper
+
+    def make_cycle_wrapper(evaluate):
+        @functools.wraps(evaluate)
+        def wrapper(monkeys, num_rounds, inspections_per_round=None):
+            counts = [[0] * len(monkeys) for _ in range(num_rounds)]
+            monkeys = evaluate(monkeys, num_rounds, counts)
+            for round_index, round_counts in enumerate(counts):
+                instrumentation.record("extrapolated_inspections_per_round", round_counts)
+                if inspections_per_round is not None:
+                    for monkey_index, count in enumerate(round_counts):
+                        inspections_per_round[round_index][monkey_index] += count
+            instrumentation.record("inspections_total",
+                                   [monkey.num_inspections for monkey in monkeys])
+            return monkeys
+        return wrapper
+
+    instrumentation.patch(module, "evaluate_rounds_vectorized", make_vectorized_wrapper)
+    instrumentation.patch(module, "evaluate_rounds_with_cycle_detection", make_cycle_wrapper)
+
+
+def _probe_day_12(instrumentation, module):
+    """Count the cells reached by BFS."""
+    def make_distances_wrapper(distances):
+        @functools.wraps(distances)
+        def wrapper(self, *args, **kwargs):
+            result = distances(self, *args, **kwargs)
+            instrumentation.count("bfs_cells_reached",
+                                  sum(1 for distance in result if distance != module.UNREACHED))
+            return result
+        return wrapper
+
+    instrumentation.patch(module.HillMap, "distances", make_distances_wrapper)
+
+
+DAY_PROBES = {
+    5: _probe_day_5,
+    9: _probe_day_9,
+    11: _probe_day_11,
+    12: _probe_day_12,
+}
+
+
+def run_instrumented(day, path, profile_path=None):
+    """Solve a single day with instrumentation enabled.
+
+    Returns the same dict as runner.run_day with an extra "instrumentation" entry. The parse
+    timer excludes the time spent reading the input, which is reported as get_input. If
+    profile_path is given, the phases also run under cProfile and the stats are dumped there.
+    """
+    instrumentation = Instrumentation()
+    profiler = cProfile.Profile() if profile_path else None
+    start = time.perf_counter()
+    module = load_day(day)
+    solver = SOLVERS[day]
+    instrumentation.timers["import"] = time.perf_counter() - start
+    for name in LOADER_READERS:
+        instrumentation.patch(loader, name, functools.partial(_timed_reader, instrumentation))
+    for name in LOADER_ITERATORS:
+        instrumentation.patch(loader, name, functools.partial(_timed_iterator, instrumentation))
+    for name in LOADER_CONTEXTS:
+        instrumentation.patch(loader, name, functools.partial(_timed_context, instrumentation))
+    if day in DAY_PROBES:
+        DAY_PROBES[day](instrumentation, module)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        with instrumentation.timer("parse"):
+            parsed = solver.parse(module, path)
+        instrumentation.timers["parse"] -= instrumentation.timers["get_input"]
+        with instrumentation.timer("part_1"):
+            part_1 = solver.part_1(module, parsed)
+        with instrumentation.timer("part_2"):
+            part_2 = solver.part_2(module, parsed)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        instrumentation.restore()
+    seconds = dict(instrumentation.timers)
+    seconds["total"] = time.perf_counter() - start
+    return {
+        "day": day,
+        "part_1": part_1,
+        "part_2": part_2,
+        "seconds": seconds,
+        "instrumentation": instrumentation.to_dict(),
+    }
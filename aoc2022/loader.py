@@ -0,0 +1,73 @@
+"""Shared problem input loader for every day."""
+
+import mmap
+import os
+import sys
+from contextlib import contextmanager
+
+
+def input_path(day, argv=None):
+    """Get the input path for the given day.
+
+    The path is taken from the first command line argument if there is one, then from the
+    AOC_DAY<day>_INPUT environment variable, and defaults to day<day>_input.txt.
+    """
+    argv = sys.argv if argv is None else argv
+    if len(argv) > 1:
+        return argv[1]
+    return os.environ.get(f"AOC_DAY{day}_INPUT", f"day{day}_input.txt")
+
+
+def read_lines(path):
+    """Read the input as a list of lines, including line endings."""
+    with open(path, encoding="utf-8") as f:
+        return f.readlines()
+
+
+def read_text(path):
+    """Read the input as a single string."""
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def read_bytes(path):
+    """Read the input as a single bytes object, without decoding it."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def iter_chunks(path, chunk_size=1 << 20):
+    """Iterate over the input as bytes chunks of at most chunk_size bytes."""
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def iter_text_lines(path):
+    """Iterate over the lines of the input, including line endings, without reading it all."""
+    with open(path, encoding="utf-8") as f:
+        yield from f
+
+
+@contextmanager
+def map_input(path):
+    """Memory-map the input as a read-only buffer for the duration of a with block, which closes
+    the map. Empty files map to an empty bytes object."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def iter_lines(buffer):
+    """Iterate over the lines of a bytes-like buffer, without line endings."""
+    start = 0
+    end = len(buffer)
+    while start < end:
+        newline = buffer.find(b"\n", start)
+        if newline == -1:
+            newline = end
+        yield buffer[start:newline].rstrip(b"\r")
+        start = newline + 1
@@ -0,0 +1,84 @@
+"""Run selected days, optionally in parallel, and report per-part timings."""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from aoc2022 import loader
+from aoc2022.days import SOLVERS, load_day
+from aoc2022.instrumentation import run_instrumented
+
+
+def day_input_path(day, input_dir=None):
+    """Get the input path for a day, looking in input_dir if given."""
+    if input_dir is not None:
+        return os.path.join(input_dir, f"day{day}_input.txt")
+    return loader.input_path(day, argv=[])
+
+
+def run_day(day, path, instrument=False, profile_dir=None):
+    """Import and solve a single day. Returns a dict of answers and timings in seconds.
+    If instrument is set or profile_dir is given, the day runs through run_instrumented."""
+    if instrument or profile_dir is not None:
+        profile_path = None if profile_dir is None else os.path.join(profile_dir, f"day{day}.prof")
+        return run_instrumented(day, path, profile_path)
+    start = time.perf_counter()
+    module = load_day(day)
+    solver = SOLVERS[day]
+    imported = time.perf_counter()
+    parsed = solver.parse(module, path)
+    parsed_time = time.perf_counter()
+    part_1 = solver.part_1(module, parsed)
+    part_1_time = time.perf_counter()
+    part_2 = solver.part_2(module, parsed)
+    part_2_time = time.perf_counter()
+    return {
+        "day": day,
+        "part_1": part_1,
+        "part_2": part_2,
+        "seconds": {
+            "import": imported - start,
+            "parse": parsed_time - imported,
+            "part_1": part_1_time - parsed_time,
+            "part_2": part_2_time - part_1_time,
+            "total": part_2_time - start,
+        },
+    }
+
+
+def run_days(days, input_dir=None, parallel=False, max_workers=None, instrument=False,
+             profile_dir=None):
+    """Solve the given days, in a process pool if parallel is set. Yields results in day order."""
+    paths = [day_input_path(day, input_dir) for day in days]
+    instrument_flags = [instrument] * len(days)
+    profile_dirs = [profile_dir] * len(days)
+    if not parallel:
+        yield from map(run_day, days, paths, instrument_flags, profile_dirs)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(run_day, days, paths, instrument_flags, profile_dirs)
+
+
+def _milliseconds(seconds):
+    """Format a duration in seconds as milliseconds."""
+    return f"{seconds * 1000:.2f} ms"
+
+
+def format_result(result):
+    """Format the answers and timings for a single day."""
+    seconds = result["seconds"]
+    phase_timings = "".join(
+        f", {phase} {_milliseconds(seconds[phase])}"
+        for phase in ("import", "get_input", "parse") if phase in seconds)
+    lines = [f"Day {result['day']} ({_milliseconds(seconds['total'])}{phase_timings})"]
+    for part in ("part_1", "part_2"):
+        answer = str(result[part])
+        label = f"  Part {part[-1]} ({_milliseconds(seconds[part])}):"
+        if "\n" in answer:
+            lines.append(label)
+            lines.extend("    " + line for line in answer.rstrip("\n").split("\n"))
+        else:
+            lines.append(f"{label} {answer}")
+    for name, value in result.get("instrumentation", {}).get("counters", {}).items():
+        lines.append(f"  {name}: {value}")
+    return "\n".join(lines)